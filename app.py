@@ -2,22 +2,41 @@ import os  # Módulo para operações com o sistema operacional
 import streamlit as st  # Biblioteca para criar interfaces web interativas
 from datetime import time  # Classe para manipulação de horários
 import pandas as pd  # Biblioteca para manipulação de dados em tabelas
-from dotenv import load_dotenv  # Biblioteca para carregar variáveis de ambiente de um arquivo .env
 
 # Importação de módulos do projeto
 from group_controller import GroupController  # Gerencia a comunicação com a API e cache dos grupos
 from groups_util import GroupUtils  # Contém funções auxiliares para manipulação dos dados dos grupos
-from task_scheduler import TaskScheduled  # Gerencia agendamentos de tarefas
+from scheduler_backend import get_scheduler  # Agendador de tarefas configurado (SCHEDULER_BACKEND)
+from evolution_client import load_env  # Carrega o .env uma única vez por processo
 
 # Garante que o .env seja carregado do diretório correto
-env_path = os.path.join(os.path.dirname(__file__), '.env')
-print(f"Tentando carregar .env de: {env_path}")
-load_dotenv(env_path)
+load_env()
 
-# Instancia o controlador para lidar com grupos
-control = GroupController()  # Cria objeto para buscar e atualizar grupos através da API
-# Busca a lista de grupos disponíveis, seja pelo cache ou diretamente pela API
-groups = control.fetch_groups()
+# O controlador é criado uma única vez e compartilhado entre as execuções do script (reruns)
+@st.cache_resource
+def get_controller():
+    """Cria o objeto para buscar e atualizar grupos através da API e sincroniza a agenda uma vez por processo."""
+    controller = GroupController()
+    try:
+        controller.reconcile_schedule(os.path.join(os.path.dirname(__file__), "summary.py"))
+    except Exception as e:
+        print(f"Não foi possível sincronizar as tarefas agendadas: {e}")
+    return controller
+
+
+# A lista de grupos fica em cache entre as interações; é invalidada com load_groups.clear()
+# sempre que as configurações de resumo mudam
+@st.cache_data(show_spinner="Carregando grupos...")
+def load_groups():
+    """Busca a lista de grupos disponíveis, seja pelo cache ou diretamente pela API."""
+    groups = get_controller().fetch_groups()
+    # Agenda em segundo plano o download das fotos dos grupos que ainda não estão no cache
+    GroupUtils().prefetch_avatars({group.group_id: group for group in groups})
+    return groups
+
+
+control = get_controller()
+groups = load_groups()
 
 # Instancia o utilitário para manipulação visual e de dados dos grupos
 ut = GroupUtils()  # Facilita o processamento e mapeamento dos grupos para a interface
@@ -28,41 +47,56 @@ group_map, options = ut.map(groups)
 col1, col2 = st.columns([1, 1])
 
 
-# Função para carregar grupos agendados de um arquivo CSV
-# Caso ocorra erro (por exemplo, arquivo não existe), retorna um DataFrame vazio
+# Função para carregar grupos agendados do armazenamento de configurações
+# Caso ocorra erro, retorna um DataFrame vazio
 
+@st.cache_data
 def load_scheduled_groups():
-    """Tenta ler grupos agendados do CSV e retorna apenas aqueles habilitados."""
+    """Lê os grupos agendados e retorna apenas aqueles habilitados."""
     try:
-        df = pd.read_csv("group_summary.csv")
-        return df[df['enabled'] == True]
+        return pd.DataFrame(control.summary_store.enabled())
     except Exception:
         return pd.DataFrame()
 
 
+def clear_cached_groups():
+    """Invalida os grupos e agendamentos em cache após alterar as configurações de resumo."""
+    load_groups.clear()
+    load_scheduled_groups.clear()
+
+
 # Função para remover um grupo agendado:
-# 1. Lê o CSV;
+# 1. Consulta a configuração do grupo;
 # 2. Verifica se o grupo existe;
 # 3. Remove a tarefa agendada do sistema;
-# 4. Atualiza o CSV sem o grupo removido.
+# 4. Remove a configuração do grupo e invalida os dados em cache.
 
 def delete_scheduled_group(group_id):
-    """Remove o grupo agendado do arquivo CSV e da lista de tarefas do sistema."""
+    """Remove o grupo agendado do armazenamento de configurações e da lista de tarefas do sistema."""
     try:
-        df = pd.read_csv("group_summary.csv")
-        if group_id not in df['group_id'].values:
+        if not control.summary_store.get(group_id):
             st.error(f"Grupo com ID {group_id} não encontrado!")
             return False
-        task_name = f"ResumoGrupo_{group_id}"
-        try:
-            TaskScheduled.delete_task(task_name)  # Tenta remover o agendamento da tarefa
-            st.success(f"Tarefa {task_name} removida do sistema")
-        except Exception as e:
-            st.warning(f"Aviso: Não foi possível remover a tarefa: {e}")
-
-        # Atualiza o CSV removendo o grupo escolhido
-        df = df[df['group_id'] != group_id]
-        df.to_csv("group_summary.csv", index=False)
+        if control.schedule_mode() == "slot":
+            # A tarefa do horário é compartilhada: remove a configuração e reconcilia a agenda
+            python_script = os.path.join(os.path.dirname(__file__), "summary.py")
+            anteriores = control.desired_jobs(python_script)
+            control.summary_store.delete(group_id)
+            try:
+                control.reconcile_schedule(python_script, previous=anteriores)
+            except Exception as e:
+                st.warning(f"Aviso: Não foi possível atualizar a agenda: {e}")
+        else:
+            task_name = f"ResumoGrupo_{group_id}"
+            try:
+                get_scheduler().delete_task(task_name)  # Tenta remover o agendamento da tarefa
+                st.success(f"Tarefa {task_name} removida do sistema")
+            except Exception as e:
+                st.warning(f"Aviso: Não foi possível remover a tarefa: {e}")
+
+            # Remove a configuração do grupo escolhido
+            control.summary_store.delete(group_id)
+        clear_cached_groups()
         st.success("Grupo removido do arquivo de configuração")
         return True
     except Exception as e:
@@ -90,13 +124,11 @@ with col1:
         st.subheader("Tarefas Agendadas")  # Subcabeçalho para a área de tarefas agendadas
         scheduled_groups = load_scheduled_groups()
         if not scheduled_groups.empty:
-            # Cria um dicionário para mapear IDs aos nomes dos grupos
-            group_dict = {group.group_id: group.name for group in groups}
             scheduled_groups_info = []
             # Para cada grupo agendado, extrai informações relevantes para exibição
             for _, row in scheduled_groups.iterrows():
                 group_id = row['group_id']
-                group_name = group_dict.get(group_id, "Nome não encontrado")
+                group_name = group_map[group_id].name if group_id in group_map else "Nome não encontrado"
                 scheduled_groups_info.append({
                     "id": group_id,
                     "name": group_name,
@@ -105,8 +137,9 @@ with col1:
                     "names": "Sim" if row['is_names'] else "Não"
                 })
             # Monta uma lista de opções com nome e horário para mostrar no seletor
-            options = [f"{info['name']} - {info['horario']}" for info in scheduled_groups_info]
-            selected_idx = st.selectbox("Grupos com Resumos Agendados:", range(len(options)), format_func=lambda x: options[x])
+            scheduled_options = [f"{info['name']} - {info['horario']}" for info in scheduled_groups_info]
+            selected_idx = st.selectbox("Grupos com Resumos Agendados:", range(len(scheduled_options)),
+                                        format_func=lambda x: scheduled_options[x])
             if selected_idx is not None:
                 selected_info = scheduled_groups_info[selected_idx]
                 # Exibe as informações do grupo agendado
@@ -137,7 +170,7 @@ with col2:
             is_names = st.checkbox("Incluir Nomes no Resumo", value=selected_group.is_names)
             # Localiza o script que será executado para gerar o resumo
             python_script = os.path.join(os.path.dirname(__file__), "summary.py")
-            # Botão para salvar as novas configurações; atualiza o CSV e agenda a tarefa
+            # Botão para salvar as novas configurações; atualiza a configuração e agenda a tarefa
             if st.button("Salvar Configurações"):
                 if control.update_summary(
                     group_id=selected_group.group_id,
@@ -147,7 +180,41 @@ with col2:
                     is_names=is_names,
                     script=python_script
                 ):
+                    clear_cached_groups()
                     st.success("Configurações salvas com sucesso!")
                     st.rerun()
                 else:
-                    st.error("Erro ao salvar as configurações. Tente novamente!")
\ No newline at end of file
+                    st.error("Erro ao salvar as configurações. Tente novamente!")
+
+        # Ações em lote: habilita ou desabilita vários grupos com um único agendamento
+        with st.expander("Ações em Lote", expanded=False):
+            selected_bulk = st.multiselect(
+                "Grupos:",
+                options,
+                format_func=lambda x: x[0]  # Mostra o nome do grupo
+            )
+            bulk_horario = st.time_input("Horário para os grupos habilitados:", value=time(22, 0), key="bulk_horario")
+            bulk_enable, bulk_disable = st.columns(2)
+            bulk_enabled = None
+            if bulk_enable.button("Habilitar Selecionados", disabled=not selected_bulk):
+                bulk_enabled = True
+            if bulk_disable.button("Desabilitar Selecionados", disabled=not selected_bulk):
+                bulk_enabled = False
+            if bulk_enabled is not None:
+                configs = [
+                    dict(
+                        group_id=group_id,
+                        horario=bulk_horario.strftime("%H:%M") if bulk_enabled else group_map[group_id].horario,
+                        enabled=bulk_enabled,
+                        is_links=group_map[group_id].is_links,
+                        is_names=group_map[group_id].is_names
+                    )
+                    for _, group_id in selected_bulk
+                ]
+                # Todas as alterações são gravadas e agendadas de uma só vez
+                if control.update_summaries(configs, script=python_script):
+                    clear_cached_groups()
+                    st.success(f"{len(configs)} grupo(s) atualizado(s) com sucesso!")
+                    st.rerun()
+                else:
+                    st.error("Erro ao atualizar os grupos selecionados. Tente novamente!")
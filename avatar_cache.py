@@ -0,0 +1,163 @@
+import os
+import time
+import base64
+import hashlib
+import threading
+from io import BytesIO
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from PIL import Image
+
+
+class AvatarCache:
+    """Cache das fotos dos grupos já redimensionadas e codificadas em base64 (PNG).
+
+    As imagens ficam em memória (LRU com até `max_memory` itens) e em disco, em `cache_dir`,
+    com até `max_disk` arquivos; a chave é a URL mais o tamanho. Consultas nunca acessam a rede:
+    fotos ausentes são baixadas por `prefetch` em segundo plano, enquanto a interface exibe um placeholder.
+    Downloads que falham ficam registrados por `failure_ttl` segundos, período em que a URL recebe o
+    placeholder e não é baixada de novo.
+    """
+
+    def __init__(self, cache_dir=None, max_memory=512, max_disk=None, workers=4, timeout=5, failure_ttl=None):
+        self.cache_dir = cache_dir or os.path.join(os.path.dirname(__file__), "avatar_cache")
+        self.max_memory = max_memory
+        self.max_disk = max_disk or int(os.getenv("AVATAR_CACHE_MAX_FILES", 5000))
+        self.timeout = timeout
+        self.failure_ttl = failure_ttl if failure_ttl is not None else int(os.getenv("AVATAR_FAILURE_TTL", 300))
+        self.memory = OrderedDict()
+        self.failures = {}
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.session = requests.Session()
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="avatar")
+        self._placeholders = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(url, size):
+        return hashlib.sha256(f"{url}|{size[0]}x{size[1]}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    @staticmethod
+    def _encode(image):
+        buffered = BytesIO()
+        image.save(buffered, format="PNG")
+        return buffered.getvalue()
+
+    def _remember(self, key, encoded):
+        with self.lock:
+            self.memory[key] = encoded
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_memory:
+                self.memory.popitem(last=False)
+
+    def placeholder(self, size=(30, 30)):
+        """Imagem cinza exibida enquanto a foto do grupo não está no cache."""
+        if size not in self._placeholders:
+            image = Image.new("RGBA", size, (200, 200, 200))
+            self._placeholders[size] = base64.b64encode(self._encode(image)).decode("utf-8")
+        return self._placeholders[size]
+
+    def get(self, url, size=(30, 30)):
+        """Retorna a foto em base64 se estiver em memória ou em disco; caso contrário, None.
+
+        Se o último download da URL falhou há menos de `failure_ttl` segundos, retorna o placeholder.
+        """
+        if not url:
+            return None
+        key = self.make_key(url, size)
+        with self.lock:
+            expira = self.failures.get(key)
+            if expira is not None:
+                if expira > time.monotonic():
+                    return self.placeholder(size)
+                del self.failures[key]
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                return self.memory[key]
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                encoded = base64.b64encode(f.read()).decode("utf-8")
+            os.utime(path)
+        except OSError:
+            return None
+        self._remember(key, encoded)
+        return encoded
+
+    def fetch(self, url, size=(30, 30)):
+        """Baixa, redimensiona e grava a foto no cache; em caso de falha registra a URL e retorna o placeholder."""
+        key = self.make_key(url, size)
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            image = Image.open(BytesIO(response.content)).convert("RGBA").resize(size)
+        except Exception:
+            with self.lock:
+                self.failures[key] = time.monotonic() + self.failure_ttl
+            return self.placeholder(size)
+        png = self._encode(image)
+        tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(png)
+        os.replace(tmp_path, self._path(key))
+        encoded = base64.b64encode(png).decode("utf-8")
+        self._remember(key, encoded)
+        return encoded
+
+    def _fetch_pending(self, url, size):
+        try:
+            self.fetch(url, size)
+        finally:
+            with self.lock:
+                self.pending.discard((url, size))
+
+    def prefetch(self, urls, size=(30, 30)):
+        """Agenda em segundo plano o download das fotos que ainda não estão no cache."""
+        agendadas = 0
+        for url in urls:
+            if not url or self.get(url, size) is not None:
+                continue
+            with self.lock:
+                if (url, size) in self.pending:
+                    continue
+                self.pending.add((url, size))
+            self.pool.submit(self._fetch_pending, url, size)
+            agendadas += 1
+        if agendadas:
+            self.pool.submit(self.evict)
+        return agendadas
+
+    def evict(self):
+        """Remove do disco as fotos acessadas há mais tempo quando o limite de arquivos é excedido."""
+        try:
+            arquivos = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith(".png")]
+        except OSError:
+            return 0
+        excesso = len(arquivos) - self.max_disk
+        if excesso <= 0:
+            return 0
+        arquivos.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in arquivos[:excesso]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        return excesso
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_avatar_cache():
+    """Retorna o AvatarCache compartilhado pelo processo."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AvatarCache()
+        return _cache
@@ -0,0 +1,101 @@
+"""Mede como GroupController.fetch_groups escala com o número de grupos (cache local, sem acessar a API).
+
+Compara a junção atual (índice por group_id) com a anterior, que filtrava o DataFrame de
+configurações para cada grupo. A junção anterior só é medida até --legacy-max grupos.
+
+Uso: python benchmarks/bench_fetch_groups.py [--sizes 100 1000 10000 50000] [--config-ratio 0.1]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from group import Group
+from group_controller import GroupController
+from groups_cache import GroupsCache
+from group_registry import GroupRegistry
+from summary_store import SummaryStore
+
+
+def build_groups_data(total):
+    """Gera a resposta de fetchAllGroups com `total` grupos."""
+    return [
+        {"id": f"1203630{i:011d}@g.us", "subject": f"Grupo {i}", "subjectOwner": f"55119{i:08d}@s.whatsapp.net",
+         "subjectTime": 1_700_000_000 + i, "pictureUrl": None, "size": 10 + i % 200, "creation": 1_690_000_000 + i,
+         "owner": f"55119{i % 500:08d}@s.whatsapp.net", "restrict": False, "announce": i % 7 == 0,
+         "isCommunity": i % 50 == 0, "isCommunityAnnounce": False}
+        for i in range(total)
+    ]
+
+
+def build_controller(tmp_dir, groups_data, config_ratio):
+    """Cria um GroupController apontando para cache e configurações temporários, sem inicializar o cliente da API."""
+    control = GroupController.__new__(GroupController)
+    cache_file = os.path.join(tmp_dir, "groups_cache.json")
+    control.groups_cache = GroupsCache(cache_file, lambda: groups_data, ttl=10 ** 9)
+    control.groups_cache.save(groups_data)
+    control.summary_store = SummaryStore(db_path=os.path.join(tmp_dir, "group_summary.db"))
+    passo = max(1, int(1 / config_ratio)) if config_ratio else 0
+    for i, group in enumerate(groups_data):
+        if passo and i % passo == 0:
+            control.summary_store.upsert(group["id"], "21:00", True, i % 2 == 0, False)
+    control.registry = GroupRegistry()
+    control._metadata = {}
+    control.groups = []
+    return control
+
+
+def legacy_fetch_groups(control):
+    """Junção anterior: uma máscara booleana no DataFrame de configurações por grupo."""
+    summary_data = control.load_summary_info()
+    groups = []
+    for group in control.groups_cache.get():
+        resumo = summary_data[summary_data["group_id"] == group["id"]]
+        resumo = resumo.iloc[0].to_dict() if not resumo.empty else {}
+        groups.append(Group(
+            group_id=group["id"], name=group["subject"], subject_owner=group.get("subjectOwner", "remoteJid"),
+            subject_time=group["subjectTime"], picture_url=group.get("pictureUrl"), size=group["size"],
+            creation=group["creation"], owner=group.get("owner"), restrict=group["restrict"],
+            announce=group["announce"], is_community=group["isCommunity"],
+            is_community_announce=group["isCommunityAnnounce"], horario=resumo.get("horario", "22:00"),
+            enabled=resumo.get("enabled", False), is_links=resumo.get("is_links", False),
+            is_names=resumo.get("is_names", False)))
+    return groups
+
+
+def measure(func, repeat):
+    inicio = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - inicio) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 50_000])
+    parser.add_argument("--config-ratio", type=float, default=0.1, help="Fração dos grupos com resumo configurado")
+    parser.add_argument("--legacy-max", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'grupos':>8} {'configs':>8} {'atual (ms)':>12} {'anterior (ms)':>14}")
+    for total in args.sizes:
+        groups_data = build_groups_data(total)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            control = build_controller(tmp_dir, groups_data, args.config_ratio)
+            configs = len(control.summary_store.all())
+            repeat = 5 if total <= 10_000 else 2
+            atual, groups = measure(control.fetch_groups, repeat)
+            anterior = "-"
+            if total <= args.legacy_max:
+                tempo, legado = measure(lambda: legacy_fetch_groups(control), 1)
+                assert [(g.group_id, g.enabled, g.horario) for g in legado] == \
+                       [(g.group_id, g.enabled, g.horario) for g in groups]
+                anterior = f"{tempo * 1000:.1f}"
+        print(f"{total:>8} {configs:>8} {atual * 1000:>12.1f} {anterior:>14}")
+
+
+if __name__ == "__main__":
+    main()
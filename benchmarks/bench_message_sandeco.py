@@ -0,0 +1,166 @@
+"""Mede o tempo de parse e o pico de memória de MessageSandeco para um dia com 10 mil mensagens.
+
+Compara a classe atual (__slots__, campos resolvidos sob demanda) com o parser anterior, que
+extraía todos os campos e decodificava o base64 dos documentos já no construtor.
+
+Uso: python benchmarks/bench_message_sandeco.py [--messages 10000]
+"""
+import os
+import sys
+import time
+import base64
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from message_sandeco import MessageSandeco
+
+
+class LegacyMessageSandeco:
+    """Parser anterior: envelopa o registro e extrai todos os campos do tipo da mensagem no construtor."""
+
+    def __init__(self, raw_data):
+        if "data" not in raw_data:
+            raw_data = {"event": None, "instance": None, "destination": None, "date_time": None,
+                        "server_url": None, "apikey": None, "data": raw_data}
+        self.data = raw_data
+        self.extract_common_data()
+        self.extract_specific_data()
+
+    def extract_common_data(self):
+        for campo in ("event", "instance", "destination", "date_time", "server_url", "apikey"):
+            setattr(self, campo, self.data.get(campo))
+        data = self.data.get("data", {})
+        key = data.get("key", {})
+        self.remote_jid = key.get("remoteJid")
+        self.message_id = key.get("id")
+        self.from_me = key.get("fromMe")
+        self.push_name = data.get("pushName")
+        self.status = data.get("status")
+        self.instance_id = data.get("instanceId")
+        self.source = data.get("source")
+        self.message_timestamp = data.get("messageTimestamp")
+        self.message_type = data.get("messageType")
+        self.sender = data.get("sender")
+        self.participant = key.get("participant")
+        if self.remote_jid.endswith("@g.us"):
+            self.scope = MessageSandeco.SCOPE_GROUP
+            self.group_id = self.remote_jid.split("@")[0]
+            self.phone = self.participant.split("@")[0] if self.participant else None
+        elif self.remote_jid.endswith("@s.whatsapp.net"):
+            self.scope = MessageSandeco.SCOPE_PRIVATE
+            self.phone = self.remote_jid.split("@")[0]
+            self.group_id = None
+        else:
+            self.scope, self.phone, self.group_id = "unknown", None, None
+
+    def extract_specific_data(self):
+        message = self.data["data"].get("message", {})
+        if self.message_type == MessageSandeco.TYPE_TEXT:
+            self.text_message = message.get("conversation")
+        elif self.message_type == MessageSandeco.TYPE_AUDIO:
+            audio = message["audioMessage"]
+            self.audio_base64_bytes = message.get("base64")
+            for campo in ("url", "mimetype", "fileSha256", "fileLength", "seconds", "mediaKey", "ptt",
+                          "fileEncSha256", "directPath", "waveform", "viewOnce"):
+                setattr(self, f"audio_{campo}", audio.get(campo))
+        elif self.message_type == MessageSandeco.TYPE_IMAGE:
+            image = message["imageMessage"]
+            for campo in ("url", "mimetype", "caption", "fileSha256", "fileLength", "height", "width", "mediaKey",
+                          "fileEncSha256", "directPath", "mediaKeyTimestamp", "jpegThumbnail", "scansSidecar",
+                          "scanLengths", "midQualityFileSha256"):
+                setattr(self, f"image_{campo}", image.get(campo))
+            self.image_caption = image.get("caption")
+            self.image_base64 = message.get("base64")
+        elif self.message_type == MessageSandeco.TYPE_DOCUMENT:
+            document = message["documentMessage"]
+            for campo in ("url", "mimetype", "title", "fileSha256", "fileLength", "mediaKey", "fileName",
+                          "fileEncSha256", "directPath"):
+                setattr(self, f"document_{campo}", document.get(campo))
+            self.document_caption = document.get("caption")
+            conteudo = message.get("base64")
+            self.document_base64_bytes = base64.b64decode(conteudo) if conteudo else None
+
+    def get_text(self):
+        if self.message_type == MessageSandeco.TYPE_TEXT:
+            return self.text_message
+        if self.message_type == MessageSandeco.TYPE_IMAGE:
+            return self.image_caption
+        if self.message_type == MessageSandeco.TYPE_DOCUMENT:
+            return self.document_caption
+        return ""
+
+    @staticmethod
+    def get_messages(messages):
+        return [LegacyMessageSandeco(msg) for msg in messages["messages"]["records"]]
+
+
+def build_day(total):
+    """Gera uma resposta de findMessages com uma mistura de textos, imagens, áudios e documentos."""
+    documento = base64.b64encode(os.urandom(48 * 1024)).decode("ascii")
+    miniatura = base64.b64encode(os.urandom(2 * 1024)).decode("ascii")
+    inicio = 1_736_000_000
+    records = []
+    for i in range(total):
+        key = {"remoteJid": "120363000000000000@g.us", "id": f"MSG{i:08d}", "fromMe": False,
+               "participant": f"55119{i % 1000:08d}@s.whatsapp.net"}
+        record = {"key": key, "pushName": f"Usuário {i % 50}", "status": "DELIVERY_ACK",
+                  "instanceId": "instancia", "source": "android", "messageTimestamp": inicio + i}
+        tipo = i % 20
+        if tipo == 0:
+            record["messageType"] = "documentMessage"
+            record["message"] = {"documentMessage": {"url": "https://mmg.whatsapp.net/d", "mimetype": "application/pdf",
+                                                     "title": "arquivo.pdf", "fileName": "arquivo.pdf",
+                                                     "caption": f"Documento {i}"},
+                                 "base64": documento}
+        elif tipo in (1, 2):
+            record["messageType"] = "imageMessage"
+            record["message"] = {"imageMessage": {"url": "https://mmg.whatsapp.net/i", "mimetype": "image/jpeg",
+                                                  "caption": f"Imagem {i}", "height": 1280, "width": 720,
+                                                  "jpegThumbnail": miniatura}}
+        elif tipo == 3:
+            record["messageType"] = "audioMessage"
+            record["message"] = {"audioMessage": {"url": "https://mmg.whatsapp.net/a", "mimetype": "audio/ogg",
+                                                  "seconds": 12, "ptt": True}}
+        else:
+            record["messageType"] = "conversation"
+            record["message"] = {"conversation": f"Mensagem de texto número {i} " * 3}
+        records.append(record)
+    return {"messages": {"total": total, "pages": 1, "currentPage": 1, "records": records}}
+
+
+def measure(parser, payload, repeat=5):
+    """Retorna (tempo médio de parse + get_text em segundos, pico de memória em bytes, textos)."""
+    inicio = time.perf_counter()
+    for _ in range(repeat):
+        msgs = parser.get_messages(payload)
+        textos = [msg.get_text() for msg in msgs]
+    tempo = (time.perf_counter() - inicio) / repeat
+    del msgs, textos
+
+    tracemalloc.start()
+    msgs = parser.get_messages(payload)
+    textos = [msg.get_text() for msg in msgs]
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tempo, pico, textos
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=10_000)
+    args = parser.parse_args()
+
+    payload = build_day(args.messages)
+    atual_tempo, atual_pico, atual_textos = measure(MessageSandeco, payload)
+    anterior_tempo, anterior_pico, anterior_textos = measure(LegacyMessageSandeco, payload)
+    assert atual_textos == anterior_textos
+
+    print(f"Mensagens: {args.messages}")
+    print(f"{'':<24} {'atual':>10} {'anterior':>10}")
+    print(f"{'Parse + get_text (ms)':<24} {atual_tempo * 1000:>10.1f} {anterior_tempo * 1000:>10.1f}")
+    print(f"{'Pico de memória (MiB)':<24} {atual_pico / 1024 / 1024:>10.1f} {anterior_pico / 1024 / 1024:>10.1f}")
+
+if __name__ == "__main__":
+    main()
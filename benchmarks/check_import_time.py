@@ -0,0 +1,102 @@
+"""Verifica o tempo de importação dos pontos de entrada com `python -X importtime`.
+
+Falha (código de saída 1) quando um módulo passa do orçamento em milissegundos, quando importa
+uma dependência pesada que deveria ser carregada sob demanda ou quando tenta abrir uma conexão
+de rede durante a importação.
+
+Uso: python benchmarks/check_import_time.py [--runs 5] [--scale 1.0] [--verbose]
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Orçamento de importação por módulo, em milissegundos (tempo acumulado informado por -X importtime)
+BUDGETS_MS = {
+    "summary": 250,
+    "send_sandeco": 200,
+    "outbound_queue": 40,
+    "summary_store": 40,
+}
+
+# Dependências que não podem ser carregadas só por importar os módulos acima
+FORBIDDEN = ("crewai", "pandas", "numpy", "PIL", "streamlit", "aiohttp")
+
+# Bloqueia conexões de rede antes de importar o módulo
+IMPORT_CODE = """
+import socket
+def _bloqueado(*args, **kwargs):
+    raise RuntimeError("conexão de rede durante a importação")
+socket.socket.connect = _bloqueado
+socket.create_connection = _bloqueado
+import {module}
+"""
+
+
+def import_profile(module):
+    """Importa o módulo em um processo novo e retorna ({nome: tempo acumulado em µs}, erro ou None)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_CODE.format(module=module)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    tempos = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        partes = line[len("import time:"):].split("|")
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+        tempos[partes[2].strip()] = int(partes[1])
+    erro = None
+    if result.returncode != 0:
+        mensagens = [line for line in result.stderr.splitlines() if line.strip() and not line.startswith("import time:")]
+        erro = mensagens[-1] if mensagens else f"código {result.returncode}"
+    return tempos, erro
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5, help="Execuções por módulo; vale o menor tempo")
+    parser.add_argument("--scale", type=float, default=float(os.getenv("IMPORT_BUDGET_SCALE", 1.0)),
+                        help="Multiplica todos os orçamentos (máquinas mais lentas)")
+    parser.add_argument("--verbose", action="store_true", help="Mostra as 10 importações mais lentas de cada módulo")
+    args = parser.parse_args()
+
+    falhas = []
+    for module, budget in BUDGETS_MS.items():
+        budget *= args.scale
+        melhor, perfil = None, {}
+        for _ in range(args.runs):
+            tempos, erro = import_profile(module)
+            if erro:
+                falhas.append(f"{module}: falha ao importar ({erro})")
+                break
+            if melhor is None or tempos.get(module, 0) < melhor:
+                melhor, perfil = tempos.get(module, 0), tempos
+        if melhor is None:
+            continue
+
+        ms = melhor / 1000
+        status = "ok" if ms <= budget else "ACIMA DO ORÇAMENTO"
+        print(f"{module:<16} {ms:8.1f} ms  (orçamento {budget:.0f} ms)  {status}")
+        if ms > budget:
+            falhas.append(f"{module}: {ms:.1f} ms > {budget:.0f} ms")
+        pesados = sorted(name for name in perfil if name.split(".")[0] in FORBIDDEN and "." not in name)
+        if pesados:
+            falhas.append(f"{module}: importa dependências pesadas na inicialização: {', '.join(pesados)}")
+        if args.verbose:
+            for name, tempo in sorted(perfil.items(), key=lambda item: item[1], reverse=True)[1:11]:
+                print(f"    {tempo / 1000:8.1f} ms  {name}")
+
+    if falhas:
+        print("\nRegressões encontradas:")
+        for falha in falhas:
+            print(f"- {falha}")
+        sys.exit(1)
+    print("\nTempo de importação dentro do orçamento.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,22 @@
 import pandas as pd  # Biblioteca para manipulação de dados em tabelas
 from group_controller import GroupController  # Permite acessar os grupos e suas informações
-from task_scheduler import TaskScheduled  # Gerencia o agendamento e remoção de tarefas do sistema
+from scheduler_backend import get_scheduler  # Agendador de tarefas configurado (SCHEDULER_BACKEND)
+from summary_store import SummaryStore  # Armazena as configurações de resumo dos grupos
+import os
 import sys  
 
 
 def list_groups():
     """Exibe na tela todos os grupos agendados, facilitando a escolha para remoção."""
-    # Lê as informações do arquivo CSV que contém o resumo dos grupos
-    df = pd.read_csv("group_summary.csv")
+    # Lê as configurações de resumo dos grupos
+    df = pd.DataFrame(SummaryStore().all(), columns=SummaryStore.COLUMNS)
     control = GroupController()  # Cria instância do controlador para acessar os grupos via API
     groups = control.fetch_groups()
     # Cria um dicionário mapeando o ID do grupo para seu nome para facilitar a identificação
     group_dict = {group.group_id: group.name for group in groups}
     
     print("\n=== GRUPOS DISPONÍVEIS ===\n")
-    # Itera sobre os grupos do CSV e exibe com numeração
+    # Itera sobre os grupos configurados e exibe com numeração
     for i, (group_id, _) in enumerate(df.iterrows(), 1):
         group_id = df.iloc[i-1]['group_id']
         group_name = group_dict.get(group_id, "Nome não encontrado")
@@ -25,32 +27,44 @@ def list_groups():
 
 def delete_scheduled_group(group_id):
     """Remove um grupo agendado:
-    1. Lê o CSV com as configurações dos grupos;
+    1. Consulta a configuração do grupo;
     2. Verifica se o grupo existe;
     3. Remove a tarefa agendada do sistema;
-    4. Atualiza o CSV removendo o grupo."""
+    4. Remove a configuração do grupo."""
     try:
-        # Lê o arquivo CSV contendo os agendamentos
-        df = pd.read_csv("group_summary.csv")
+        store = SummaryStore()
         
-        # Verifica se o ID passado existe no CSV
-        if group_id not in df['group_id'].values:
+        # Verifica se o ID passado está configurado
+        if not store.get(group_id):
             print(f"Grupo com ID {group_id} não encontrado!")
             return False
         
+        if GroupController.schedule_mode() == "slot":
+            # A tarefa ResumoSlot_HHMM é compartilhada com outros grupos do horário:
+            # remove a configuração e reconcilia a agenda, que apaga a tarefa se o horário ficar vazio
+            control = GroupController()
+            python_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "summary.py")
+            anteriores = control.desired_jobs(python_script)
+            store.delete(group_id)
+            print("Grupo removido do arquivo de configuração")
+            try:
+                control.reconcile_schedule(python_script, previous=anteriores)
+            except Exception as e:
+                print(f"Aviso: Não foi possível atualizar a agenda: {e}")
+            return True
+
         # Define o nome da tarefa agendada baseado no ID do grupo
         task_name = f"ResumoGrupo_{group_id}"
         try:
             # Tenta remover a tarefa agendada do sistema
-            TaskScheduled.delete_task(task_name)
+            get_scheduler().delete_task(task_name)
             print(f"Tarefa {task_name} removida do sistema")
         except Exception as e:
             # Caso não seja possível remover, exibe uma mensagem de aviso
             print(f"Aviso: Não foi possível remover a tarefa do sistema: {e}")
         
-        # Remove o grupo do DataFrame e salva a atualização no CSV
-        df = df[df['group_id'] != group_id]
-        df.to_csv("group_summary.csv", index=False)
+        # Remove a configuração do grupo em uma única transação
+        store.delete(group_id)
         print("Grupo removido do arquivo de configuração")
         
         return True
@@ -0,0 +1,213 @@
+import os
+import time
+import bisect
+import mimetypes
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt import MultipartEncoder
+from dotenv import load_dotenv
+from evolutionapi.client import EvolutionClient
+from evolutionapi.services.message import MessageService
+
+DEFAULT_BASE_URL = "http://localhost:8081"
+
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+def load_env():
+    """Carrega o .env do diretório do projeto uma única vez por processo."""
+    global _env_loaded
+    with _env_lock:
+        if not _env_loaded:
+            load_dotenv(os.path.join(os.path.dirname(__file__), ".env"), override=True)
+            _env_loaded = True
+
+
+def get_settings():
+    """Retorna as configurações do Evolution API lidas do ambiente."""
+    load_env()
+    base_url = os.getenv("EVO_BASE_URL") or DEFAULT_BASE_URL
+    if "<" in base_url or ">" in base_url:
+        print("URL inválida detectada, redefinindo para padrão...")
+        base_url = DEFAULT_BASE_URL
+    return {
+        "base_url": base_url,
+        "api_token": os.getenv("EVO_API_TOKEN"),
+        "instance_id": os.getenv("EVO_INSTANCE_NAME"),
+        "instance_token": os.getenv("EVO_INSTANCE_TOKEN"),
+    }
+
+
+class LatencyHistogram:
+    """Histograma de latências por endpoint, com faixas fixas em segundos."""
+
+    BOUNDS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def observe(self, endpoint, seconds):
+        with self.lock:
+            hist = self.data.get(endpoint)
+            if hist is None:
+                hist = self.data[endpoint] = {"count": 0, "total": 0.0, "max": 0.0, "buckets": [0] * (len(self.BOUNDS) + 1)}
+            hist["count"] += 1
+            hist["total"] += seconds
+            hist["max"] = max(hist["max"], seconds)
+            hist["buckets"][bisect.bisect_left(self.BOUNDS, seconds)] += 1
+
+    def _quantile(self, hist, q):
+        """Estimativa do quantil pelo limite superior da faixa que o contém."""
+        alvo = q * hist["count"]
+        acumulado = 0
+        for i, quantidade in enumerate(hist["buckets"]):
+            acumulado += quantidade
+            if acumulado >= alvo:
+                return min(self.BOUNDS[i], hist["max"]) if i < len(self.BOUNDS) else hist["max"]
+        return hist["max"]
+
+    def metrics(self):
+        """Retorna, por endpoint, contagem, média, p50, p95, máximo e as contagens por faixa."""
+        with self.lock:
+            return {
+                endpoint: {
+                    "count": hist["count"],
+                    "avg": hist["total"] / hist["count"],
+                    "p50": self._quantile(hist, 0.5),
+                    "p95": self._quantile(hist, 0.95),
+                    "max": hist["max"],
+                    "buckets": dict(zip([f"<={b}" for b in self.BOUNDS] + ["inf"], hist["buckets"])),
+                }
+                for endpoint, hist in self.data.items()
+            }
+
+
+class PooledMessageService(MessageService):
+    """MessageService cujos envios multipart usam a sessão do cliente em vez de requests.post."""
+
+    def _post_multipart(self, endpoint, instance_id, instance_token, fields, file):
+        if isinstance(file, str):
+            mime_type = mimetypes.guess_type(file)[0] or "application/octet-stream"
+            with open(file, "rb") as f:
+                fields["file"] = ("file", f, mime_type)
+                return self._send_multipart(endpoint, instance_id, instance_token, fields)
+        if file:
+            fields["file"] = ("file", file, "application/octet-stream")
+        return self._send_multipart(endpoint, instance_id, instance_token, fields)
+
+    def _send_multipart(self, endpoint, instance_id, instance_token, fields):
+        multipart = MultipartEncoder(fields=fields)
+        headers = self.client._get_headers(instance_token)
+        headers["Content-Type"] = multipart.content_type
+        response = self.client.request("POST", f"{endpoint}/{instance_id}", headers=headers, data=multipart)
+        return response.json()
+
+    def send_media(self, instance_id, message, instance_token, file=None):
+        fields = {
+            "number": (None, message.number, "text/plain"),
+            "mediatype": (None, message.mediatype, "text/plain"),
+            "mimetype": (None, message.mimetype, "text/plain"),
+            "caption": (None, message.caption, "text/plain"),
+            "fileName": (None, message.fileName, "text/plain"),
+        }
+        if getattr(message, "delay", None) is not None:
+            fields["delay"] = (None, str(message.delay), "text/plain; type=number")
+        return self._post_multipart("message/sendMedia", instance_id, instance_token, fields, file)
+
+    def send_whatsapp_audio(self, instance_id, message, instance_token, file=None):
+        fields = {}
+        for key, value in message.items():
+            if key == "delay" and value is not None:
+                fields[key] = (None, str(value), "text/plain; type=number")
+            else:
+                fields[key] = (None, str(value), "text/plain")
+        return self._post_multipart("message/sendWhatsAppAudio", instance_id, instance_token, fields, file)
+
+
+class PooledEvolutionClient(EvolutionClient):
+    """EvolutionClient que reaproveita conexões keep-alive por meio de uma requests.Session.
+
+    O tamanho do pool e os timeouts vêm de EVO_POOL_SIZE, EVO_CONNECT_TIMEOUT e EVO_READ_TIMEOUT;
+    cada requisição tem a latência registrada em `latency`, agrupada pelo endpoint sem o nome da instância.
+    """
+
+    def __init__(self, base_url, api_token, pool_size=None, connect_timeout=None, read_timeout=None):
+        super().__init__(base_url=base_url, api_token=api_token)
+        pool_size = pool_size or int(os.getenv("EVO_POOL_SIZE", 10))
+        self.timeout = (
+            connect_timeout or float(os.getenv("EVO_CONNECT_TIMEOUT", 5)),
+            read_timeout or float(os.getenv("EVO_READ_TIMEOUT", 60)),
+        )
+        self.session = requests.Session()
+        # Os retries por rate-overlimit ficam a cargo do RateLimiter, não do adapter
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.latency = LatencyHistogram()
+        self.messages = PooledMessageService(self)
+
+    @staticmethod
+    def _endpoint_name(endpoint):
+        """'chat/findMessages/minha-instancia?x=1' -> 'chat/findMessages'."""
+        return "/".join(endpoint.split("?", 1)[0].strip("/").split("/")[:2])
+
+    def request(self, method, endpoint, **kwargs):
+        """Executa a requisição pela sessão compartilhada, registrando a latência do endpoint."""
+        inicio = time.perf_counter()
+        try:
+            return self.session.request(method, self._get_full_url(endpoint), timeout=self.timeout, **kwargs)
+        finally:
+            self.latency.observe(self._endpoint_name(endpoint), time.perf_counter() - inicio)
+
+    def get(self, endpoint, instance_token=None):
+        """Faz uma requisição GET."""
+        response = self.request("GET", endpoint, headers=self._get_headers(instance_token))
+        return self._handle_response(response)
+
+    def post(self, endpoint, data=None, instance_token=None, files=None):
+        """Faz uma requisição POST; como no cliente original, devolve o JSON sem lançar exceção."""
+        headers = self._get_headers(instance_token)
+        if files:
+            fields = {
+                key: str(value) if not isinstance(value, (int, float)) else (None, str(value), "text/plain")
+                for key, value in (data or {}).items()
+            }
+            fields["file"] = tuple(files["file"][:3])
+            multipart = MultipartEncoder(fields=fields)
+            headers["Content-Type"] = multipart.content_type
+            response = self.request("POST", endpoint, headers=headers, data=multipart)
+        else:
+            response = self.request("POST", endpoint, headers=headers, json=data)
+        return response.json()
+
+    def put(self, endpoint, data=None):
+        """Faz uma requisição PUT."""
+        response = self.request("PUT", endpoint, headers=self._get_headers(), json=data)
+        return self._handle_response(response)
+
+    def delete(self, endpoint, instance_token=None):
+        """Faz uma requisição DELETE."""
+        response = self.request("DELETE", endpoint, headers=self._get_headers(instance_token))
+        return self._handle_response(response)
+
+    def close(self):
+        """Fecha as conexões do pool."""
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_evolution_client():
+    """Retorna o PooledEvolutionClient compartilhado pelo processo."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            settings = get_settings()
+            print(f"Inicializando EvolutionClient com URL: {settings['base_url']}")
+            _client = PooledEvolutionClient(settings["base_url"], settings["api_token"])
+        return _client
@@ -1,6 +1,19 @@
 # group.py
 
 class Group:
+    """Grupo do WhatsApp com as configurações de resumo.
+
+    Usa __slots__ para evitar um __dict__ por objeto em listas com milhares de grupos; FIELDS define
+    a ordem das colunas usada pelos conversores em lote (to_columns, from_columns, to_dataframe).
+    """
+
+    FIELDS = (
+        "group_id", "name", "subject_owner", "subject_time", "picture_url", "size", "creation", "owner",
+        "restrict", "announce", "is_community", "is_community_announce",
+        "dias", "horario", "enabled", "is_links", "is_names",
+    )
+    __slots__ = FIELDS
+
     def __init__(self,
                  group_id,
                  name,
@@ -60,6 +73,45 @@ class Group:
         self.is_links = is_links
         self.is_names = is_names
 
+    def to_dict(self):
+        """Retorna os campos do grupo como dicionário, na ordem de FIELDS."""
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def to_columns(cls, groups):
+        """Converte uma lista de grupos para o formato colunar: {campo: [valores]}."""
+        return {field: [getattr(group, field) for group in groups] for field in cls.FIELDS}
+
+    @classmethod
+    def from_columns(cls, columns):
+        """Reconstrói a lista de grupos a partir do formato colunar gerado por to_columns."""
+        return [cls(**dict(zip(cls.FIELDS, values))) for values in zip(*(columns[field] for field in cls.FIELDS))]
+
+    @classmethod
+    def to_dataframe(cls, groups):
+        """Retorna um DataFrame do pandas com uma linha por grupo."""
+        import pandas as pd
+        return pd.DataFrame(cls.to_columns(groups), columns=list(cls.FIELDS))
+
+    @classmethod
+    def to_parquet(cls, groups, path):
+        """Grava os grupos em Parquet; requer o pyarrow instalado."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Exportar para Parquet requer o pacote pyarrow (pip install pyarrow).") from e
+        pq.write_table(pa.table(cls.to_columns(groups)), path)
+
+    @classmethod
+    def from_parquet(cls, path):
+        """Lê os grupos gravados por to_parquet."""
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Ler Parquet requer o pacote pyarrow (pip install pyarrow).") from e
+        return cls.from_columns(pq.read_table(path).to_pydict())
+
     def __repr__(self):
         """
         Retorna uma representação legível do grupo.
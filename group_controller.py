@@ -1,30 +1,34 @@
 import sys
 import os
-import json
-from dotenv import load_dotenv
 from datetime import datetime
-from evolutionapi.client import EvolutionClient
 from group import Group
-import pandas as pd
 from message_sandeco import MessageSandeco
-from task_scheduler import TaskScheduled
+from rate_limiter import get_rate_limiter
+from evolution_client import get_settings, get_evolution_client
+from groups_cache import GroupsCache
+from group_registry import GroupRegistry
+from summary_store import SummaryStore
+from message_store import MessageStore
+import tracing
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 class GroupController:
     """Gerencia grupos, cache, consultas à API e agendamento de tarefas."""
+
+    # Quantidade de mensagens pedidas por página em findMessages
+    MESSAGES_PAGE_SIZE = 250
+    # Prefixo do nome das tarefas agendadas de resumo por grupo
+    TASK_PREFIX = "ResumoGrupo_"
     
     def __init__(self):
         """Inicializa o controlador de grupos com configurações do ambiente."""
-        # Carrega .env do diretório do arquivo
-        env_path = os.path.join(os.path.dirname(__file__), '.env')
-        load_dotenv(env_path, override=True)
-        
-        # Carrega e valida a URL base
-        self.base_url = os.getenv("EVO_BASE_URL", 'http://localhost:8081')
-        self.api_token = os.getenv("EVO_API_TOKEN")
-        self.instance_id = os.getenv("EVO_INSTANCE_NAME")
-        self.instance_token = os.getenv("EVO_INSTANCE_TOKEN")
+        # Configurações do .env, carregado uma única vez pelo provedor do cliente
+        settings = get_settings()
+        self.base_url = settings["base_url"]
+        self.api_token = settings["api_token"]
+        self.instance_id = settings["instance_id"]
+        self.instance_token = settings["instance_token"]
         
         # Configura caminhos dos arquivos
         paths_this = os.path.dirname(__file__)
@@ -35,90 +39,48 @@ class GroupController:
         if not all([self.api_token, self.instance_id, self.instance_token]):
             raise ValueError("API_TOKEN, INSTANCE_NAME ou INSTANCE_TOKEN não configurados.")
             
-        print(f"Inicializando EvolutionClient com URL: {self.base_url}")
-        self.client = EvolutionClient(base_url=self.base_url, api_token=self.api_token)
+        self.client = get_evolution_client()
+        self.rate_limiter = get_rate_limiter()
+        self.groups_cache = GroupsCache(self.cache_file, self._fetch_from_api)
+        self.registry = GroupRegistry()
+        self._metadata = {}
+        self.summary_store = SummaryStore(csv_file=self.csv_file)
+        self.message_store = MessageStore()
         self.groups = []
 
     def _load_cache(self):
         """Carrega dados do cache para evitar chamadas desnecessárias à API."""
-        if not os.path.exists(self.cache_file):
-            return None
-        try:
-            with open(self.cache_file, 'r') as f:
-                return json.load(f)
-        except json.decoder.JSONDecodeError as e:
-            print(f"Cache com formato inválido. Removendo o arquivo: {e}")
-            os.remove(self.cache_file)
-            return None
-        except Exception as e:
-            print(f"Erro ao carregar cache: {str(e)}")
-            return None
+        return self.groups_cache.load()
 
     def _save_cache(self, groups_data):
-        """Salva dados dos grupos no cache com um timestamp, garantindo que groups_data seja JSON serializável."""
-        try:
-            # Verifica se groups_data é do tipo serializável (list ou dict), senão ajusta
-            if not isinstance(groups_data, (list, dict)):
-                print("groups_data não é serializável. Ajustando para lista vazia.")
-                groups_data = []
-            cache_data = {
-                'timestamp': datetime.now().isoformat(),
-                'groups': groups_data
-            }
-            with open(self.cache_file, 'w') as f:
-                json.dump(cache_data, f)
-        except Exception as e:
-            print(f"Erro ao salvar cache: {str(e)}")
+        """Salva dados dos grupos no cache de forma atômica."""
+        self.groups_cache.save(groups_data)
+
+    def cache_stats(self):
+        """Retorna os contadores de acertos, falhas e atualizações do cache de grupos."""
+        return dict(self.groups_cache.stats)
 
     def _fetch_from_api(self):
-        """Busca grupos diretamente da API com retries em caso de limite de requisições."""
-        import time
-        from evolutionapi.exceptions import EvolutionAPIError
-        
-        # Verifica se as configurações ainda estão válidas
-        if '<' in self.base_url or '>' in self.base_url:
-            print("URL inválida detectada, redefinindo para padrão...")
-            self.base_url = 'http://localhost:8081'
-            self.client = EvolutionClient(base_url=self.base_url, api_token=self.api_token)
-            
-        max_retries = 3
-        base_delay = 15
-        for attempt in range(max_retries):
-            try:
-                print(f"Tentativa {attempt + 1}: Fazendo requisição para {self.base_url}")
-                return self.client.group.fetch_all_groups(
-                    instance_id=self.instance_id,
-                    instance_token=self.instance_token,
-                    get_participants=False
-                )
-            except EvolutionAPIError as e:
-                if 'rate-overlimit' in str(e) and attempt < max_retries - 1:
-                    wait_time = base_delay * (2 ** attempt)
-                    print(f"Rate limit atingido. Aguardando {wait_time} segundos...")
-                    time.sleep(wait_time)
-                else:
-                    print(f"Erro na API: {str(e)}")
-                    raise
-        raise Exception("Não foi possível buscar os grupos após várias tentativas")
+        """Busca grupos diretamente da API; o limitador compartilhado cuida de esperas e retries por rate-overlimit."""
+        print(f"Fazendo requisição para {self.base_url}")
+        return self.rate_limiter.call(
+            "fetch_all_groups",
+            self.client.group.fetch_all_groups,
+            instance_id=self.instance_id,
+            instance_token=self.instance_token,
+            get_participants=False
+        )
 
+    @tracing.traced("group_controller.fetch_groups")
     def fetch_groups(self, force_refresh=False):
         """Obtém a lista de grupos usando cache ou consulta à API."""
-        summary_data = self.load_summary_info()
         groups_data = None
         if not force_refresh:
-            cache_data = self._load_cache()
-            if cache_data and "groups" in cache_data:
-                print("Usando dados do cache...")
-                groups_data = cache_data["groups"]
-            else:
-                print("Cache não encontrado. Buscando da API...")
-                groups_data = self._fetch_from_api()
-                self._save_cache(groups_data)
+            groups_data = self.groups_cache.get()
         else:
             try:
                 print("Forçando atualização da API...")
-                groups_data = self._fetch_from_api()
-                self._save_cache(groups_data)
+                groups_data = self.groups_cache.refresh()
             except Exception as e:
                 if "rate-overlimit" in str(e):
                     print("Rate limit atingido. Verificando cache para fallback...")
@@ -129,22 +91,25 @@ class GroupController:
                         raise e
                 else:
                     raise e
-        self.groups = []
+        self.registry.update(groups_data)
+        self.groups = self.build_groups(groups_data)
+        tracing.set_attribute("groups", len(self.groups))
+        return self.groups
+
+    def build_groups(self, groups_data, configs=None):
+        """Monta os objetos Group juntando os dados da API às configurações de resumo em uma única passada.
+
+        Se `configs` (group_id -> configuração) não for informado, todas as configurações são carregadas.
+        """
+        # Índice group_id -> configuração, construído uma vez em vez de filtrar a tabela para cada grupo
+        if configs is None:
+            configs = {resumo["group_id"]: resumo for resumo in self.summary_store.all()}
+        padrao = {"horario": "22:00", "enabled": False, "is_links": False, "is_names": False}
+        groups = []
         for group in groups_data:
             group_id = group["id"]
-            resumo = summary_data[summary_data["group_id"] == group_id]
-            if not resumo.empty:
-                resumo = resumo.iloc[0].to_dict()
-                horario = resumo.get("horario", "22:00")
-                enabled = resumo.get("enabled", False)
-                is_links = resumo.get("is_links", False)
-                is_names = resumo.get("is_names", False)
-            else:
-                horario = "22:00"
-                enabled = False
-                is_links = False
-                is_names = False
-            self.groups.append(
+            resumo = configs.get(group_id, padrao)
+            groups.append(
                 Group(
                     group_id=group_id,
                     name=group["subject"],
@@ -158,101 +123,241 @@ class GroupController:
                     announce=group["announce"],
                     is_community=group["isCommunity"],
                     is_community_announce=group["isCommunityAnnounce"],
-                    horario=horario,
-                    enabled=enabled,
-                    is_links=is_links,
-                    is_names=is_names
+                    horario=resumo["horario"],
+                    enabled=resumo["enabled"],
+                    is_links=resumo["is_links"],
+                    is_names=resumo["is_names"]
                 )
             )
-        return self.groups
+        return groups
 
     def load_summary_info(self):
-        """Carrega ou cria o DataFrame de informações resumidas dos grupos."""
-        try:
-            return pd.read_csv(self.csv_file)
-        except FileNotFoundError:
-            return pd.DataFrame(columns=["group_id", "dias", "horario", "enabled", "is_links", "is_names"])
+        """Carrega as informações resumidas dos grupos como DataFrame."""
+        # O pandas só é importado aqui, para não pesar na inicialização de summary.py
+        import pandas as pd
+        return pd.DataFrame(self.summary_store.all(), columns=SummaryStore.COLUMNS)
 
     def load_data_by_group(self, group_id):
         """Carrega os dados de resumo para um grupo específico."""
         try:
-            df = self.load_summary_info()
-            resumo = df[df["group_id"] == group_id]
-            return resumo.iloc[0].to_dict() if not resumo.empty else False
+            return self.summary_store.get(group_id) or False
         except Exception:
             return False
 
     def update_summary(self, group_id, horario, enabled, is_links, is_names, script):
         """Atualiza ou adiciona as configurações de resumo de um grupo e agenda a tarefa se necessário."""
+        return self.update_summaries(
+            [dict(group_id=group_id, horario=horario, enabled=enabled, is_links=is_links, is_names=is_names)],
+            script
+        )
+
+    @staticmethod
+    def schedule_mode():
+        """Modo de agendamento: "group" (uma tarefa por grupo, padrão) ou "slot" (uma tarefa por horário)."""
+        mode = os.getenv("SCHEDULE_MODE", "group").lower()
+        if mode not in ("group", "slot"):
+            raise ValueError(f"SCHEDULE_MODE inválido: {mode}")
+        return mode
+
+    def task_name(self, group_id, horario):
+        """Nome da tarefa agendada que resume o grupo no SCHEDULE_MODE atual."""
+        if self.schedule_mode() == "slot":
+            from scheduler_backend import slot_task_name
+            return slot_task_name(horario)
+        return self.TASK_PREFIX + group_id
+
+    def update_summaries(self, configs, script):
+        """Atualiza as configurações de vários grupos e aplica todos os agendamentos em uma única operação.
+
+        `configs` é uma lista de dicionários com group_id, horario, enabled, is_links e is_names.
+        No modo "slot" a agenda é reconciliada a partir das configurações gravadas.
+        """
+        # Importado aqui para não pesar na inicialização de summary.py
+        from scheduler_backend import get_scheduler, make_job
         try:
-            df = self.load_summary_info()
-            if group_id in df["group_id"].values:
-                df.loc[df["group_id"] == group_id, ["horario", "enabled", "is_links", "is_names"]] = [
-                    horario, enabled, is_links, is_names
-                ]
-            else:
-                nova_linha = {
-                    "group_id": group_id,
-                    "horario": horario,
-                    "enabled": enabled,
-                    "is_links": is_links,
-                    "is_names": is_names
-                }
-                df = pd.concat([df, pd.DataFrame([nova_linha])], ignore_index=True)
-            task_name = f"ResumoGrupo_{group_id}"
-            try:
-                TaskScheduled.delete_task(task_name)
-            except Exception:
-                pass
-            if enabled:
-                python_script = os.path.join(script)
-                TaskScheduled.create_task(
-                    task_name,
-                    python_script,
-                    schedule_type='DAILY',
-                    time=horario
-                )
-            df.to_csv(self.csv_file, index=False)
+            if self.schedule_mode() == "slot":
+                anteriores = self.desired_jobs(script)
+                self.summary_store.upsert_many(configs)
+                self.reconcile_schedule(script, previous=anteriores)
+                return True
+
+            atuais = {resumo["group_id"]: resumo for resumo in self.summary_store.all()}
+            upserts, deletes = [], []
+            for resumo in configs:
+                task_name = self.TASK_PREFIX + resumo["group_id"]
+                atual = atuais.get(resumo["group_id"])
+                # Só altera o agendador quando a habilitação ou o horário mudam
+                if resumo["enabled"]:
+                    if not (atual and atual["enabled"] and atual["horario"] == resumo["horario"]):
+                        upserts.append(make_job(task_name, script, resumo["horario"]))
+                elif atual and atual["enabled"]:
+                    deletes.append(task_name)
+            get_scheduler().apply(upserts=upserts, deletes=deletes)
+            self.summary_store.upsert_many(configs)
             return True
         except Exception as e:
             print(f"Erro ao salvar as configurações: {e}")
             return False
 
+    def desired_jobs(self, script):
+        """Tarefas que devem estar agendadas segundo as configurações habilitadas e o SCHEDULE_MODE.
+
+        No modo "slot" há uma tarefa ResumoSlot_HHMM por horário distinto, executando summary_batch.py
+        (atraso aleatório de até SUMMARY_SLOT_JITTER segundos); no modo "group", uma ResumoGrupo_<id> por grupo.
+        """
+        from scheduler_backend import make_job, make_slot_job
+        enabled = self.summary_store.enabled()
+        if self.schedule_mode() == "slot":
+            batch_script = os.path.join(os.path.dirname(os.path.abspath(script)), "summary_batch.py")
+            jitter = int(os.getenv("SUMMARY_SLOT_JITTER", 0))
+            return [make_slot_job(horario, batch_script, jitter) for horario in sorted({r["horario"] for r in enabled})]
+        return [make_job(self.TASK_PREFIX + resumo["group_id"], script, resumo["horario"]) for resumo in enabled]
+
+    def reconcile_schedule(self, script, previous=None, force=False):
+        """Sincroniza o agendador com as configurações habilitadas, aplicando só as diferenças de uma vez.
+
+        Tarefas por grupo e por horário são reconciliadas juntas, então trocar o SCHEDULE_MODE
+        remove as tarefas do modo anterior. `previous` (desired_jobs antes de alterar as configurações)
+        e `force` valem para sistemas em que o agendador não pode ser lido; veja SchedulerBackend.reconcile.
+        """
+        from scheduler_backend import get_scheduler, SLOT_PREFIX
+        resultado = get_scheduler().reconcile(
+            self.desired_jobs(script), (self.TASK_PREFIX, SLOT_PREFIX), previous=previous, force=force
+        )
+        if resultado.get("skipped"):
+            return resultado
+        print(f"Agenda sincronizada: {resultado['inserts']} inserida(s), {resultado['updates']} atualizada(s), "
+              f"{resultado['deletes']} removida(s), {resultado['unchanged']} sem alteração")
+        return resultado
+
     def get_groups(self):
         """Retorna a lista de grupos processada."""
         return self.groups
 
+    def _sync_registry(self):
+        """Atualiza os índices do registro a partir do cache de grupos, sem montar a lista completa."""
+        self.registry.update(self.groups_cache.get())
+        return self.registry
+
+    def _build_selected(self, groups_data):
+        """Monta objetos Group para poucos grupos, consultando só as configurações deles."""
+        configs = {}
+        for group in groups_data:
+            resumo = self.summary_store.get(group["id"])
+            if resumo:
+                configs[group["id"]] = resumo
+        return self.build_groups(groups_data, configs)
+
     def find_group_by_id(self, group_id):
         """Procura um grupo pelo seu identificador."""
-        if not self.groups:
-            self.groups = self.fetch_groups()
-        for group in self.groups:
-            if group.group_id == group_id:
-                return group
-        return None
+        group = self._sync_registry().get(group_id)
+        return self._build_selected([group])[0] if group else None
+
+    @tracing.traced("group_controller.get_group_metadata")
+    def get_group_metadata(self, group_id):
+        """Obtém os dados de um único grupo sem listar todos os grupos da instância.
+
+        Consulta primeiro o cache local de grupos (sem disparar atualização) e, se o grupo não estiver
+        nele, faz uma chamada à API só para esse grupo (findGroupInfos). Retorna um Group ou None.
+        """
+        tracing.set_attribute("group_id", group_id)
+        cache_data = self.groups_cache.load()
+        if cache_data and "groups" in cache_data:
+            self.registry.update(cache_data["groups"])
+            group = self.registry.get(group_id)
+            if group:
+                tracing.set_attribute("source", "cache")
+                return self._build_selected([group])[0]
+
+        tracing.set_attribute("source", "memo" if group_id in self._metadata else "api")
+        if group_id not in self._metadata:
+            try:
+                group = self.rate_limiter.call(
+                    "get_group_info",
+                    self.client.group.get_group_info,
+                    instance_id=self.instance_id,
+                    group_jid=group_id,
+                    instance_token=self.instance_token
+                )
+            except Exception as e:
+                print(f"Erro ao buscar os dados do grupo {group_id}: {e}")
+                return None
+            if not isinstance(group, dict) or "id" not in group:
+                print(f"Grupo {group_id} não encontrado na API.")
+                return None
+            group.pop("participants", None)
+            self._metadata[group_id] = group
+        return self._build_selected([self._metadata[group_id]])[0]
 
     def filter_groups_by_owner(self, owner):
         """Filtra os grupos de um determinado proprietário."""
-        return [group for group in self.groups if group.owner == owner]
+        return self.build_groups(self._sync_registry().by_owner(owner))
 
-    def get_messages(self, group_id, start_date, end_date):
-        """Obtém e filtra as mensagens de um grupo entre duas datas."""
-        def to_iso8601(date_str):
-            dt = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-            return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
-        timestamp_start = to_iso8601(start_date)
-        timestamp_end = to_iso8601(end_date)
-        group_mensagens = self.client.chat.get_messages(
-            instance_id=self.instance_id,
-            remote_jid=group_id,
-            instance_token=self.instance_token,
-            timestamp_start=timestamp_start,
-            timestamp_end=timestamp_end,
-            page=1,
-            offset=1000
-        )
-        msgs = MessageSandeco.get_messages(group_mensagens)
+    def filter_communities(self, is_community=True):
+        """Filtra os grupos que são (ou não são) comunidades."""
+        return self.build_groups(self._sync_registry().communities(is_community))
+
+    def search_groups_by_name(self, prefix):
+        """Retorna os grupos cujo nome começa com o prefixo informado, sem diferenciar maiúsculas."""
+        return self.build_groups(self._sync_registry().search_name(prefix))
+
+    @staticmethod
+    def _to_iso8601(date_str):
+        """Converte uma data no formato "%Y-%m-%d %H:%M:%S" para ISO 8601."""
+        dt = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
+        return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def iter_messages(self, group_id, start_date, end_date, page_size=None):
+        """Percorre todas as páginas de mensagens de um grupo, gerando objetos MessageSandeco à medida que chegam.
+
+        A API devolve os registros do mais recente para o mais antigo, então a paginação
+        termina assim que surge um registro anterior a start_date. Apenas uma página fica em memória.
+        """
+        page_size = page_size or self.MESSAGES_PAGE_SIZE
+        timestamp_start = self._to_iso8601(start_date)
+        timestamp_end = self._to_iso8601(end_date)
         data_obj = datetime.strptime(timestamp_start, "%Y-%m-%dT%H:%M:%SZ")
         timestamp_limite = int(data_obj.timestamp())
-        msgs_filtradas = [msg for msg in msgs if msg.message_timestamp >= timestamp_limite]
-        return msgs_filtradas
+
+        page = 1
+        while True:
+            # O span cobre só a chamada à API: um span aberto entre os yields do gerador vazaria para o chamador
+            with tracing.span("group_controller.get_messages_page", group_id=group_id, page=page) as span:
+                group_mensagens = self.rate_limiter.call(
+                    "get_messages",
+                    self.client.chat.get_messages,
+                    instance_id=self.instance_id,
+                    remote_jid=group_id,
+                    instance_token=self.instance_token,
+                    timestamp_start=timestamp_start,
+                    timestamp_end=timestamp_end,
+                    page=page,
+                    offset=page_size
+                )
+                pagina = group_mensagens.get("messages", {})
+                records = pagina.get("records", [])
+                span.set_attribute("records", len(records))
+            if not records:
+                return
+            for msg in MessageSandeco.get_messages(group_mensagens):
+                if msg.message_timestamp < timestamp_limite:
+                    return
+                yield msg
+            # Sem "pages" na resposta, segue até vir uma página incompleta
+            total_pages = pagina.get("pages")
+            if len(records) < page_size or (total_pages is not None and page >= total_pages):
+                return
+            page += 1
+
+    def get_messages(self, group_id, start_date, end_date):
+        """Obtém e filtra as mensagens de um grupo entre duas datas."""
+        return list(self.iter_messages(group_id, start_date, end_date))
+
+    def get_archived_messages(self, group_id, start_date, end_date):
+        """Sincroniza o arquivo local do grupo com as mensagens novas da API e lê o período do disco."""
+        with tracing.span("group_controller.sync_messages", group_id=group_id):
+            self.message_store.sync(group_id, self.iter_messages, start_date, end_date)
+        with tracing.span("group_controller.read_archive", group_id=group_id) as span:
+            msgs = self.message_store.get_messages(group_id, start_date, end_date)
+            span.set_attribute("messages", len(msgs))
+        return msgs
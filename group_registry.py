@@ -0,0 +1,110 @@
+import bisect
+import threading
+
+
+class GroupRegistry:
+    """Índices em memória sobre os dados brutos dos grupos (resposta de fetchAllGroups).
+
+    Mantém tabelas hash por group_id, owner e is_community e uma lista ordenada de nomes para
+    busca por prefixo. `update` cruza a nova lista com a anterior pelo group_id e reindexa apenas
+    os grupos adicionados, removidos ou cujo nome, dono ou comunidade mudou, inserindo e removendo
+    esses nomes da lista ordenada com bisect; chamar `update` com a mesma lista não custa nada.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._source = None
+        self._by_id = {}
+        self._by_owner = {}
+        self._by_community = {True: set(), False: set()}
+        self._names = []
+
+    def __len__(self):
+        return len(self._by_id)
+
+    @staticmethod
+    def _name_key(name):
+        return (name or "").casefold()
+
+    @classmethod
+    def _index_keys(cls, raw):
+        """Campos usados pelos índices; se não mudarem, o grupo não precisa ser reindexado."""
+        return cls._name_key(raw.get("subject")), raw.get("owner"), bool(raw.get("isCommunity"))
+
+    def _index(self, group_id, raw, sort=True):
+        self._by_id[group_id] = raw
+        self._by_owner.setdefault(raw.get("owner"), set()).add(group_id)
+        self._by_community[bool(raw.get("isCommunity"))].add(group_id)
+        entrada = (self._name_key(raw.get("subject")), group_id)
+        if sort:
+            bisect.insort(self._names, entrada)
+        else:
+            self._names.append(entrada)
+
+    def _unindex(self, group_id):
+        raw = self._by_id.pop(group_id)
+        owner = raw.get("owner")
+        ids = self._by_owner.get(owner)
+        if ids is not None:
+            ids.discard(group_id)
+            if not ids:
+                del self._by_owner[owner]
+        self._by_community[bool(raw.get("isCommunity"))].discard(group_id)
+        entrada = (self._name_key(raw.get("subject")), group_id)
+        i = bisect.bisect_left(self._names, entrada)
+        if i < len(self._names) and self._names[i] == entrada:
+            del self._names[i]
+
+    def update(self, groups_data):
+        """Sincroniza os índices com a lista de grupos; retorna quantos grupos foram reindexados."""
+        with self._lock:
+            if groups_data is self._source:
+                return 0
+            novos = {group["id"]: group for group in groups_data}
+            alterados = 0
+            for group_id in [group_id for group_id in self._by_id if group_id not in novos]:
+                self._unindex(group_id)
+                alterados += 1
+            # Na primeira carga os nomes são acrescentados e ordenados uma única vez no final
+            carga_inicial = not self._by_id
+            for group_id, raw in novos.items():
+                atual = self._by_id.get(group_id)
+                if atual is raw:
+                    continue
+                if atual is not None:
+                    if self._index_keys(atual) == self._index_keys(raw):
+                        # Índices inalterados: só troca o dicionário para não reter a lista antiga em memória
+                        self._by_id[group_id] = raw
+                        continue
+                    self._unindex(group_id)
+                self._index(group_id, raw, sort=not carga_inicial)
+                alterados += 1
+            if carga_inicial:
+                self._names.sort()
+            self._source = groups_data
+            return alterados
+
+    def get(self, group_id):
+        """Retorna os dados brutos do grupo, ou None."""
+        return self._by_id.get(group_id)
+
+    def by_owner(self, owner):
+        """Dados brutos dos grupos de um proprietário."""
+        with self._lock:
+            return [self._by_id[group_id] for group_id in self._by_owner.get(owner, ())]
+
+    def communities(self, is_community=True):
+        """Dados brutos dos grupos que são (ou não são) comunidades."""
+        with self._lock:
+            return [self._by_id[group_id] for group_id in self._by_community[bool(is_community)]]
+
+    def search_name(self, prefix):
+        """Dados brutos dos grupos cujo nome começa com `prefix` (sem diferenciar maiúsculas), em ordem alfabética."""
+        prefix = self._name_key(prefix)
+        with self._lock:
+            resultado = []
+            for name, group_id in self._names[bisect.bisect_left(self._names, (prefix,)):]:
+                if not name.startswith(prefix):
+                    break
+                resultado.append(self._by_id[group_id])
+            return resultado
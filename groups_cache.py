@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from datetime import datetime
+
+
+class GroupsCache:
+    """Cache em disco da lista de grupos com TTL, revalidação em segundo plano e escrita atômica.
+
+    - Dentro do TTL o conteúdo do arquivo é devolvido diretamente.
+    - Após o TTL a cópia antiga continua sendo servida enquanto uma thread busca a versão nova.
+    - Cada gravação calcula uma ETag (hash do conteúdo); se a API devolver os mesmos grupos,
+      o arquivo não é reescrito, apenas tem sua data de modificação renovada.
+    - A gravação usa arquivo temporário + os.replace, então outro processo nunca lê um arquivo pela metade.
+    - O conteúdo lido fica em memória enquanto o arquivo não muda (mesmo mtime e tamanho), evitando
+      decodificar o JSON a cada consulta; os dados devolvidos não devem ser alterados por quem os usa.
+    """
+
+    def __init__(self, cache_file, loader, ttl=None):
+        self.cache_file = cache_file
+        self.loader = loader
+        self.ttl = ttl if ttl is not None else float(os.getenv("GROUPS_CACHE_TTL", 6 * 3600))
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "unchanged": 0, "refresh_errors": 0}
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._memo = (None, None)
+
+    @staticmethod
+    def compute_etag(groups_data):
+        """Calcula a ETag do conteúdo a partir de um hash do JSON normalizado."""
+        payload = json.dumps(groups_data, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def age(self):
+        """Idade do cache em segundos, ou None se o arquivo não existir."""
+        try:
+            return time.time() - os.path.getmtime(self.cache_file)
+        except OSError:
+            return None
+
+    def is_fresh(self):
+        """Indica se o cache existe e ainda está dentro do TTL."""
+        age = self.age()
+        return age is not None and age < self.ttl
+
+    def load(self):
+        """Lê o cache do disco; retorna None se ele não existir ou estiver corrompido."""
+        try:
+            st = os.stat(self.cache_file)
+        except OSError:
+            return None
+        # os.utime de um refresh sem mudanças altera o mtime e força uma nova leitura, o que é raro e barato
+        key = (st.st_mtime_ns, st.st_size)
+        memo_key, memo_data = self._memo
+        if memo_key == key:
+            return memo_data
+        try:
+            with open(self.cache_file, 'r') as f:
+                cache_data = json.load(f)
+            self._memo = (key, cache_data)
+            return cache_data
+        except json.decoder.JSONDecodeError as e:
+            print(f"Cache com formato inválido. Removendo o arquivo: {e}")
+            os.remove(self.cache_file)
+            return None
+        except Exception as e:
+            print(f"Erro ao carregar cache: {str(e)}")
+            return None
+
+    def save(self, groups_data, etag=None):
+        """Grava o cache de forma atômica, junto com o timestamp e a ETag."""
+        try:
+            # Verifica se groups_data é do tipo serializável (list ou dict), senão ajusta
+            if not isinstance(groups_data, (list, dict)):
+                print("groups_data não é serializável. Ajustando para lista vazia.")
+                groups_data = []
+            cache_data = {
+                'timestamp': datetime.now().isoformat(),
+                'etag': etag or self.compute_etag(groups_data),
+                'groups': groups_data
+            }
+            cache_dir = os.path.dirname(os.path.abspath(self.cache_file))
+            fd, tmp_path = tempfile.mkstemp(prefix=".groups_cache.", suffix=".tmp", dir=cache_dir)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(cache_data, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.cache_file)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        except Exception as e:
+            print(f"Erro ao salvar cache: {str(e)}")
+
+    def refresh(self):
+        """Busca os grupos com o loader e atualiza o cache, evitando reescrita quando a ETag não mudou."""
+        groups_data = self.loader()
+        self._count("refreshes")
+        etag = self.compute_etag(groups_data)
+        cache_data = self.load()
+        if cache_data and cache_data.get("etag") == etag:
+            self._count("unchanged")
+            os.utime(self.cache_file)
+        else:
+            self.save(groups_data, etag)
+        return groups_data
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            self._count("refresh_errors")
+            print(f"Erro ao atualizar o cache em segundo plano: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def refresh_async(self):
+        """Dispara uma atualização em segundo plano, se ainda não houver uma em andamento."""
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+        threading.Thread(target=self._refresh_in_background, name="groups-cache-refresh", daemon=True).start()
+        return True
+
+    def get(self):
+        """Retorna os grupos do cache, servindo a cópia antiga e revalidando em segundo plano após o TTL."""
+        cache_data = self.load()
+        if cache_data and "groups" in cache_data:
+            if self.is_fresh():
+                self._count("hits")
+            else:
+                print("Cache expirado. Usando dados antigos enquanto atualiza em segundo plano...")
+                self._count("stale_hits")
+                self.refresh_async()
+            return cache_data["groups"]
+        print("Cache não encontrado. Buscando da API...")
+        self._count("misses")
+        return self.refresh()
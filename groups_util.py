@@ -1,21 +1,13 @@
 import pandas as pd
-import base64
-import requests
 import streamlit as st
-from PIL import Image
-from io import BytesIO
 from datetime import datetime
+from avatar_cache import get_avatar_cache
 
 class GroupUtils:
     """
     Classe de utilitários para manipulação de imagens, datas e grupos.
     """
 
-    def resized_image_to_base64(self, image):
-        buffered = BytesIO()
-        image.save(buffered, format="PNG")
-        return base64.b64encode(buffered.getvalue()).decode("utf-8")
-
     def format_date(self, timestamp):
         try:
             dt = datetime.fromtimestamp(int(timestamp))
@@ -23,26 +15,26 @@ class GroupUtils:
         except (ValueError, TypeError):
             return "Data inválida"
 
-    def get_image(self, url, size=(30, 30)):
-        try:
-            if not url:
-                raise ValueError("URL vazio")
-            response = requests.get(url, stream=True, timeout=5)
-            image = Image.open(response.raw).convert("RGBA").resize(size)
-            return image
-        except Exception:
-            return Image.new("RGBA", size, (200, 200, 200))
-
     def map(self, groups):
         self.group_map = {group.group_id: group for group in groups}
         self.options = [(group.name, group.group_id) for group in groups]
         return self.group_map, self.options
 
+    def prefetch_avatars(self, group_map=None, size=(30, 30)):
+        """Baixa em segundo plano as fotos de todos os grupos que ainda não estão no cache."""
+        group_map = group_map if group_map is not None else self.group_map
+        return get_avatar_cache().prefetch((group.picture_url for group in group_map.values()), size)
+
     def head_group(self, title, url_image):
-        resized_image = self.get_image(url_image)
+        # Usa a foto do cache; se ainda não estiver disponível, mostra um placeholder e agenda o download
+        cache = get_avatar_cache()
+        image_base64 = cache.get(url_image)
+        if image_base64 is None:
+            cache.prefetch([url_image])
+            image_base64 = cache.placeholder()
         image_title = f"""
         <div style="display: flex; align-items: center;">
-            <img src="data:image/png;base64,{self.resized_image_to_base64(resized_image)}" 
+            <img src="data:image/png;base64,{image_base64}" 
              alt="Grupo" 
              style="width:30px; height:30px; border-radius: 50%; margin-right: 10px;">
             <h3 style="margin: 0;">{title}</h3>
@@ -1,42 +1,54 @@
-import pandas as pd
 from group_controller import GroupController
-from task_scheduler import TaskScheduled
+from scheduler_backend import get_scheduler
 
 def list_scheduled_groups():
     """
-    Lista todos os grupos que têm tarefas de resumo agendadas.
+    Lista todos os grupos que têm tarefas de resumo agendadas e compara com as tarefas instaladas.
     """
     try:
-        df = pd.read_csv("group_summary.csv")
-        enabled_groups = df[df['enabled'] == True]
+        control = GroupController()
+        enabled_groups = control.summary_store.enabled()
+        scheduler = get_scheduler()
+        # Lê o agendador uma única vez; None quando o sistema não permite interpretar as tarefas
+        installed = scheduler.installed()
 
-        if enabled_groups.empty:
+        if not enabled_groups:
             print("Nenhum grupo tem resumos agendados.")
-            return
-
-        print("\n=== GRUPOS COM RESUMOS AGENDADOS ===\n")
+        else:
+            print("\n=== GRUPOS COM RESUMOS AGENDADOS ===\n")
 
-        control = GroupController()
-        groups = control.fetch_groups()
-        group_dict = {group.group_id: group.name for group in groups}
+        for resumo in enabled_groups:
+            group_id = resumo['group_id']
+            grupo = control.get_group_metadata(group_id)
+            group_name = grupo.name if grupo else "Nome não encontrado"
 
-        for _, row in enabled_groups.iterrows():
-            group_id = row['group_id']
-            horario = row['horario']
-            group_name = group_dict.get(group_id, "Nome não encontrado")
-            
             print(f"Grupo: {group_name}")
             print(f"ID: {group_id}")
-            print(f"Horário: {horario}")
-            print(f"Links habilitados: {'Sim' if row['is_links'] else 'Não'}")
-            print(f"Nomes habilitados: {'Sim' if row['is_names'] else 'Não'}")
+            print(f"Horário: {resumo['horario']}")
+            print(f"Links habilitados: {'Sim' if resumo['is_links'] else 'Não'}")
+            print(f"Nomes habilitados: {'Sim' if resumo['is_names'] else 'Não'}")
+            if installed is not None:
+                tarefa = installed.get(control.task_name(group_id, resumo['horario']))
+                if tarefa is None:
+                    print("Tarefa no sistema: AUSENTE (execute reconcile_scheduled_tasks.py)")
+                elif tarefa["horario"] != resumo['horario']:
+                    print(f"Tarefa no sistema: horário divergente ({tarefa['horario']})")
+                else:
+                    print("Tarefa no sistema: OK")
             print("-" * 50)
-        
+
         print("\n=== TAREFAS NO SISTEMA ===\n")
-        TaskScheduled.list_tasks()
-        
+        if installed is None:
+            scheduler.list_tasks()
+        elif not installed:
+            print("Nenhuma tarefa encontrada.")
+        else:
+            for task_name, tarefa in sorted(installed.items(), key=lambda item: (item[1]["horario"], item[0])):
+                print(f"{tarefa['horario']}  {task_name}")
+                print(f"    {tarefa['script']} {' '.join(tarefa['args'])}")
+
     except Exception as e:
         print(f"Erro ao listar grupos agendados: {str(e)}")
 
 if __name__ == "__main__":
-    list_scheduled_groups()
\ No newline at end of file
+    list_scheduled_groups()
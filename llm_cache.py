@@ -0,0 +1,119 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+class LLMCache:
+    """Cache persistente de respostas do LLM endereçado pelo conteúdo da chamada.
+
+    A chave é um hash do modelo, do template da tarefa e das entradas normalizadas (para o resumo,
+    a identidade das mensagens da parte, não o texto com a hora da execução); uma mesma
+    janela de mensagens resumida duas vezes (por exemplo, num retry após falha de envio)
+    devolve o resultado gravado sem gastar tokens. As entradas expiram após `ttl` segundos e,
+    acima de `max_entries`, as menos usadas recentemente são removidas.
+    """
+
+    def __init__(self, db_path=None, ttl=None, max_entries=None):
+        self.db_path = db_path or os.path.join(os.path.dirname(__file__), "llm_cache.db")
+        self.ttl = ttl if ttl is not None else float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))
+        self.max_entries = max_entries or int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1000))
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS llm_cache (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_access REAL NOT NULL
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+        finally:
+            conn.close()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    @staticmethod
+    def _normalize(value):
+        """Normaliza espaços em branco dos textos para que diferenças de indentação não mudem a chave."""
+        if isinstance(value, str):
+            return " ".join(value.split())
+        if isinstance(value, dict):
+            return {key: LLMCache._normalize(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [LLMCache._normalize(item) for item in value]
+        return value
+
+    @classmethod
+    def make_key(cls, model, template, inputs):
+        """Gera a chave do cache a partir do modelo, do template da tarefa e das entradas."""
+        payload = json.dumps(
+            {"model": model, "template": cls._normalize(template), "inputs": cls._normalize(inputs)},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Retorna a resposta gravada para a chave, ou None se não existir ou estiver expirada."""
+        agora = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute(
+                    "SELECT value FROM llm_cache WHERE key = ? AND created_at >= ?", (key, agora - self.ttl)
+                ).fetchone()
+                if row:
+                    conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (agora, key))
+        finally:
+            conn.close()
+        self._count("hits" if row else "misses")
+        return row[0] if row else None
+
+    def put(self, key, value):
+        """Grava uma resposta e aplica a remoção por validade e por tamanho."""
+        agora = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, value, agora, agora)
+                )
+                removidas = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (agora - self.ttl,)).rowcount
+                removidas += conn.execute("""
+                    DELETE FROM llm_cache WHERE key IN (
+                        SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,)).rowcount
+        finally:
+            conn.close()
+        if removidas:
+            self._count("evictions", removidas)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Retorna o LLMCache compartilhado pelo processo."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
@@ -1,58 +1,106 @@
 import base64
+import tracing
 
 class MessageSandeco:
     TYPE_TEXT = "conversation"
     TYPE_AUDIO = "audioMessage"
     TYPE_IMAGE = "imageMessage"
     TYPE_DOCUMENT = "documentMessage"
-    
+
     SCOPE_GROUP = "group"
     SCOPE_PRIVATE = "private"
-    
+
+    # Apenas os campos usados com frequência ocupam slots; o restante é lido do registro sob demanda
+    __slots__ = (
+        "raw", "_envelope",
+        "remote_jid", "message_id", "from_me", "participant", "push_name",
+        "message_timestamp", "message_type",
+        "scope", "group_id", "phone",
+    )
+
+    # Campos do envelope do webhook (ausentes quando a mensagem vem de findMessages)
+    ENVELOPE_FIELDS = ("event", "instance", "destination", "date_time", "server_url", "apikey")
+
+    # Atributo -> chave no registro da mensagem
+    RECORD_FIELDS = {
+        "status": "status",
+        "instance_id": "instanceId",
+        "source": "source",
+        "sender": "sender",
+    }
+
+    # Atributo -> (tipo da mensagem, chave no conteúdo do tipo, valor padrão)
+    LAZY_FIELDS = {
+        "audio_url": (TYPE_AUDIO, "url", None),
+        "audio_mimetype": (TYPE_AUDIO, "mimetype", None),
+        "audio_file_sha256": (TYPE_AUDIO, "fileSha256", None),
+        "audio_file_length": (TYPE_AUDIO, "fileLength", None),
+        "audio_duration_seconds": (TYPE_AUDIO, "seconds", None),
+        "audio_media_key": (TYPE_AUDIO, "mediaKey", None),
+        "audio_ptt": (TYPE_AUDIO, "ptt", None),
+        "audio_file_enc_sha256": (TYPE_AUDIO, "fileEncSha256", None),
+        "audio_direct_path": (TYPE_AUDIO, "directPath", None),
+        "audio_waveform": (TYPE_AUDIO, "waveform", None),
+        "audio_view_once": (TYPE_AUDIO, "viewOnce", False),
+        "image_url": (TYPE_IMAGE, "url", None),
+        "image_mimetype": (TYPE_IMAGE, "mimetype", None),
+        "image_caption": (TYPE_IMAGE, "caption", None),
+        "image_file_sha256": (TYPE_IMAGE, "fileSha256", None),
+        "image_file_length": (TYPE_IMAGE, "fileLength", None),
+        "image_height": (TYPE_IMAGE, "height", None),
+        "image_width": (TYPE_IMAGE, "width", None),
+        "image_media_key": (TYPE_IMAGE, "mediaKey", None),
+        "image_file_enc_sha256": (TYPE_IMAGE, "fileEncSha256", None),
+        "image_direct_path": (TYPE_IMAGE, "directPath", None),
+        "image_media_key_timestamp": (TYPE_IMAGE, "mediaKeyTimestamp", None),
+        "image_thumbnail_base64": (TYPE_IMAGE, "jpegThumbnail", None),
+        "image_scans_sidecar": (TYPE_IMAGE, "scansSidecar", None),
+        "image_scan_lengths": (TYPE_IMAGE, "scanLengths", None),
+        "image_mid_quality_file_sha256": (TYPE_IMAGE, "midQualityFileSha256", None),
+        "document_url": (TYPE_DOCUMENT, "url", None),
+        "document_mimetype": (TYPE_DOCUMENT, "mimetype", None),
+        "document_title": (TYPE_DOCUMENT, "title", None),
+        "document_file_sha256": (TYPE_DOCUMENT, "fileSha256", None),
+        "document_file_length": (TYPE_DOCUMENT, "fileLength", None),
+        "document_media_key": (TYPE_DOCUMENT, "mediaKey", None),
+        "document_file_name": (TYPE_DOCUMENT, "fileName", None),
+        "document_file_enc_sha256": (TYPE_DOCUMENT, "fileEncSha256", None),
+        "document_direct_path": (TYPE_DOCUMENT, "directPath", None),
+        "document_caption": (TYPE_DOCUMENT, "caption", None),
+    }
+
+    # Atributo -> tipo da mensagem cujo base64 ele expõe
+    BASE64_FIELDS = {
+        "audio_base64_bytes": TYPE_AUDIO,
+        "image_base64": TYPE_IMAGE,
+        "document_base64_bytes": TYPE_DOCUMENT,
+    }
+
     def __init__(self, raw_data):
-        if "data" not in raw_data:
-            enveloped_data = {
-                "event": None,
-                "instance": None,
-                "destination": None,
-                "date_time": None,
-                "server_url": None,
-                "apikey": None,
-                "data": raw_data
-            }
+        """Aceita tanto o envelope do webhook (com a chave "data") quanto o registro puro de findMessages."""
+        if "data" in raw_data:
+            self._envelope = raw_data
+            self.raw = raw_data.get("data", {})
         else:
-            enveloped_data = raw_data
-        
-        self.data = enveloped_data
+            self._envelope = None
+            self.raw = raw_data
         self.extract_common_data()
-        self.extract_specific_data()
-    
+
     def extract_common_data(self):
-        """Extrai dados comuns e define os atributos básicos da mensagem."""
-        self.event = self.data.get("event")
-        self.instance = self.data.get("instance")
-        self.destination = self.data.get("destination")
-        self.date_time = self.data.get("date_time")
-        self.server_url = self.data.get("server_url")
-        self.apikey = self.data.get("apikey")
-        
-        data = self.data.get("data", {})
+        """Extrai os dados comuns usados com frequência; os demais são lidos sob demanda."""
+        data = self.raw
         key = data.get("key", {})
-        
+
         self.remote_jid = key.get("remoteJid")
         self.message_id = key.get("id")
         self.from_me = key.get("fromMe")
+        self.participant = key.get("participant")
         self.push_name = data.get("pushName")
-        self.status = data.get("status")
-        self.instance_id = data.get("instanceId")
-        self.source = data.get("source")
         self.message_timestamp = data.get("messageTimestamp")
         self.message_type = data.get("messageType")
-        self.sender = data.get("sender")
-        self.participant = key.get("participant")
-        
+
         self.determine_scope()
-    
+
     def determine_scope(self):
         """Determina o escopo da mensagem e extrai informações adicionais baseado no tipo (grupo ou privado)."""
         if self.remote_jid.endswith("@g.us"):
@@ -67,83 +115,74 @@ class MessageSandeco:
             self.scope = "unknown"
             self.phone = None
             self.group_id = None
-    
-    def extract_specific_data(self):
-        """Extrai dados específicos com base no tipo da mensagem."""
-        if self.message_type == self.TYPE_TEXT:
-            self.extract_text_message()
-        elif self.message_type == self.TYPE_AUDIO:
-            self.extract_audio_message()
-        elif self.message_type == self.TYPE_IMAGE:
-            self.extract_image_message()
-        elif self.message_type == self.TYPE_DOCUMENT:
-            self.extract_document_message()
-    
-    def extract_text_message(self):
-        """Extrai o conteúdo de uma mensagem de texto."""
-        self.text_message = self.data["data"]["message"].get("conversation")
-    
-    def extract_audio_message(self):
-        """Extrai dados de uma mensagem de áudio."""
-        audio_data = self.data["data"]["message"]["audioMessage"]
-        self.audio_base64_bytes = self.data["data"]["message"].get("base64")
-        self.audio_url = audio_data.get("url")
-        self.audio_mimetype = audio_data.get("mimetype")
-        self.audio_file_sha256 = audio_data.get("fileSha256")
-        self.audio_file_length = audio_data.get("fileLength")
-        self.audio_duration_seconds = audio_data.get("seconds")
-        self.audio_media_key = audio_data.get("mediaKey")
-        self.audio_ptt = audio_data.get("ptt")
-        self.audio_file_enc_sha256 = audio_data.get("fileEncSha256")
-        self.audio_direct_path = audio_data.get("directPath")
-        self.audio_waveform = audio_data.get("waveform")
-        self.audio_view_once = audio_data.get("viewOnce", False)
-    
-    def extract_image_message(self):
-        """Extrai dados de uma mensagem de imagem."""
-        image_data = self.data["data"]["message"]["imageMessage"]
-        self.image_url = image_data.get("url")
-        self.image_mimetype = image_data.get("mimetype")
-        self.image_caption = image_data.get("caption")
-        self.image_file_sha256 = image_data.get("fileSha256")
-        self.image_file_length = image_data.get("fileLength")
-        self.image_height = image_data.get("height")
-        self.image_width = image_data.get("width")
-        self.image_media_key = image_data.get("mediaKey")
-        self.image_file_enc_sha256 = image_data.get("fileEncSha256")
-        self.image_direct_path = image_data.get("directPath")
-        self.image_media_key_timestamp = image_data.get("mediaKeyTimestamp")
-        self.image_thumbnail_base64 = image_data.get("jpegThumbnail")
-        self.image_scans_sidecar = image_data.get("scansSidecar")
-        self.image_scan_lengths = image_data.get("scanLengths")
-        self.image_mid_quality_file_sha256 = image_data.get("midQualityFileSha256")
-        self.image_base64 = self.data["data"]["message"].get("base64")
-    
-    def extract_document_message(self):
-        """Extrai dados de uma mensagem de documento."""
-        document_data = self.data["data"]["message"]["documentMessage"]
-        self.document_url = document_data.get("url")
-        self.document_mimetype = document_data.get("mimetype")
-        self.document_title = document_data.get("title")
-        self.document_file_sha256 = document_data.get("fileSha256")
-        self.document_file_length = document_data.get("fileLength")
-        self.document_media_key = document_data.get("mediaKey")
-        self.document_file_name = document_data.get("fileName")
-        self.document_file_enc_sha256 = document_data.get("fileEncSha256")
-        self.document_direct_path = document_data.get("directPath")
-        self.document_caption = document_data.get("caption", None)
-        self.document_base64_bytes = self.decode_base64(self.data["data"]["message"].get("base64"))
-    
+
+    def __getattr__(self, name):
+        """Resolve sob demanda os campos raramente usados a partir do registro original."""
+        if name in self.RECORD_FIELDS:
+            return self.raw.get(self.RECORD_FIELDS[name])
+        if name in self.ENVELOPE_FIELDS:
+            return self._envelope.get(name) if self._envelope else None
+
+        tipo = None
+        if name in self.LAZY_FIELDS:
+            tipo, chave, padrao = self.LAZY_FIELDS[name]
+        elif name in self.BASE64_FIELDS:
+            tipo = self.BASE64_FIELDS[name]
+        elif name == "text_message":
+            tipo = self.TYPE_TEXT
+
+        # Assim como antes, os campos específicos só existem para o tipo da mensagem
+        if tipo is None or tipo != self.message_type:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        message = self.raw.get("message") or {}
+        if name == "text_message":
+            return message.get("conversation")
+        if name == "document_base64_bytes":
+            return self.decode_base64(message.get("base64"))
+        if name in self.BASE64_FIELDS:
+            return message.get("base64")
+        return (message.get(tipo) or {}).get(chave, padrao)
+
+    @property
+    def data(self):
+        """Retorna a mensagem no formato de envelope do webhook, montando-o apenas quando solicitado."""
+        if self._envelope is not None:
+            return self._envelope
+        return {
+            "event": None,
+            "instance": None,
+            "destination": None,
+            "date_time": None,
+            "server_url": None,
+            "apikey": None,
+            "data": self.raw
+        }
+
     def decode_base64(self, base64_string):
         """Converte uma string codificada em base64 para bytes."""
         if base64_string:
             return base64.b64decode(base64_string)
         return None
-    
+
     def get(self):
-        """Retorna todos os atributos da instância como um dicionário."""
-        return self.__dict__
-    
+        """Retorna todos os atributos da mensagem como um dicionário."""
+        atributos = {"data": self.data}
+        for name in self.ENVELOPE_FIELDS:
+            atributos[name] = getattr(self, name)
+        for name in self.__slots__:
+            if not name.startswith("_") and name != "raw":
+                atributos[name] = getattr(self, name)
+        for name in self.RECORD_FIELDS:
+            atributos[name] = getattr(self, name)
+        especificos = list(self.LAZY_FIELDS) + list(self.BASE64_FIELDS) + ["text_message"]
+        for name in especificos:
+            try:
+                atributos[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        return atributos
+
     def get_text(self):
         """Retorna o texto principal da mensagem, dependendo do tipo."""
         text = ""
@@ -154,14 +193,15 @@ class MessageSandeco:
         elif self.message_type == self.TYPE_DOCUMENT:
             text = self.document_caption
         return text
-    
+
     def get_name(self):
         """Retorna o nome do remetente, conforme indicado no push_name."""
         return self.push_name
-    
+
     @staticmethod
     def get_messages(messages):
         """Cria uma lista de objetos MessageSandeco a partir de um dicionário contendo registros de mensagens."""
         msgs = messages['messages']['records']
-        mensagens = [MessageSandeco(msg) for msg in msgs]
-        return mensagens
\ No newline at end of file
+        with tracing.span("message_sandeco.get_messages", records=len(msgs)):
+            mensagens = [MessageSandeco(msg) for msg in msgs]
+        return mensagens
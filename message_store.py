@@ -0,0 +1,185 @@
+import os
+import json
+import sqlite3
+from datetime import datetime
+from message_sandeco import MessageSandeco
+
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+
+
+class MessageStore:
+    """Arquivo local de mensagens dos grupos em SQLite, indexado por (remote_jid, message_timestamp, message_id).
+
+    Cada sincronização pede à API apenas os trechos do período que ainda não foram sincronizados
+    (tabela synced_ranges, por grupo); resumos e análises leem o período direto do disco. Um trecho
+    só é registrado depois que a busca dele termina, então uma busca interrompida não deixa lacunas,
+    e janelas antigas nunca arquivadas são buscadas quando pedidas.
+    """
+
+    # Campos com mídia em base64 não são necessários para resumos e não são arquivados
+    CAMPOS_PESADOS = ("base64", "jpegThumbnail")
+
+    def __init__(self, db_path=None, overlap=None):
+        self.db_path = db_path or os.path.join(os.path.dirname(__file__), "messages_archive.db")
+        # Segundos no fim de cada trecho sincronizado que são buscados de novo (mensagens atrasadas)
+        self.overlap = overlap if overlap is not None else int(os.getenv("MESSAGE_SYNC_OVERLAP", 600))
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS messages (
+                        remote_jid TEXT NOT NULL,
+                        message_timestamp INTEGER NOT NULL,
+                        message_id TEXT NOT NULL,
+                        push_name TEXT,
+                        message_type TEXT,
+                        raw TEXT NOT NULL,
+                        PRIMARY KEY (remote_jid, message_timestamp, message_id)
+                    ) WITHOUT ROWID
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS synced_ranges (
+                        remote_jid TEXT NOT NULL,
+                        start_ts INTEGER NOT NULL,
+                        end_ts INTEGER NOT NULL,
+                        PRIMARY KEY (remote_jid, start_ts)
+                    )
+                """)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_timestamp(date_str):
+        return int(datetime.strptime(date_str, FORMATO_DATA).timestamp())
+
+    @classmethod
+    def _strip_record(cls, record):
+        """Remove do registro os campos de mídia em base64 antes de arquivá-lo."""
+        message = record.get("message")
+        if not isinstance(message, dict):
+            return record
+        enxuta = {key: value for key, value in message.items() if key not in cls.CAMPOS_PESADOS}
+        for key, value in enxuta.items():
+            if isinstance(value, dict) and any(campo in value for campo in cls.CAMPOS_PESADOS):
+                enxuta[key] = {k: v for k, v in value.items() if k not in cls.CAMPOS_PESADOS}
+        return dict(record, message=enxuta)
+
+    def synced_ranges(self, remote_jid):
+        """Retorna os intervalos [início, fim] (timestamps) já sincronizados por completo, em ordem."""
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT start_ts, end_ts FROM synced_ranges WHERE remote_jid = ? ORDER BY start_ts", (remote_jid,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def missing_ranges(self, remote_jid, inicio, fim):
+        """Trechos de [inicio, fim] que ainda precisam ser buscados na API.
+
+        O final de cada intervalo sincronizado é tratado como não coberto pelos últimos
+        `overlap` segundos, para buscar de novo mensagens entregues com atraso.
+        """
+        faltando = []
+        cursor = inicio
+        for start_ts, end_ts in self.synced_ranges(remote_jid):
+            coberto_ate = max(start_ts, end_ts - self.overlap)
+            if coberto_ate < cursor:
+                continue
+            if start_ts > fim:
+                break
+            if start_ts > cursor:
+                faltando.append((cursor, start_ts))
+            cursor = max(cursor, coberto_ate)
+        if cursor < fim:
+            faltando.append((cursor, fim))
+        return faltando
+
+    def _mark_synced(self, remote_jid, inicio, fim):
+        """Registra [inicio, fim] como sincronizado, fundindo com os intervalos que se sobrepõem ou se encostam."""
+        conn = self._connect()
+        try:
+            with conn:
+                sobrepostos = conn.execute("""
+                    SELECT start_ts, end_ts FROM synced_ranges
+                    WHERE remote_jid = ? AND start_ts <= ? AND end_ts >= ?
+                """, (remote_jid, fim, inicio)).fetchall()
+                for start_ts, end_ts in sobrepostos:
+                    inicio, fim = min(inicio, start_ts), max(fim, end_ts)
+                conn.execute("DELETE FROM synced_ranges WHERE remote_jid = ? AND start_ts <= ? AND end_ts >= ?",
+                             (remote_jid, fim, inicio))
+                conn.execute("INSERT INTO synced_ranges (remote_jid, start_ts, end_ts) VALUES (?, ?, ?)",
+                             (remote_jid, inicio, fim))
+        finally:
+            conn.close()
+
+    def save(self, msgs):
+        """Grava objetos MessageSandeco no arquivo, ignorando mensagens já existentes; retorna quantas foram inseridas."""
+        rows = [
+            (
+                msg.remote_jid,
+                int(msg.message_timestamp),
+                msg.message_id,
+                msg.push_name,
+                msg.message_type,
+                json.dumps(self._strip_record(msg.raw), ensure_ascii=False),
+            )
+            for msg in msgs
+        ]
+        if not rows:
+            return 0
+        conn = self._connect()
+        try:
+            with conn:
+                antes = conn.total_changes
+                conn.executemany("""
+                    INSERT OR IGNORE INTO messages
+                        (remote_jid, message_timestamp, message_id, push_name, message_type, raw)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, rows)
+                return conn.total_changes - antes
+        finally:
+            conn.close()
+
+    def sync(self, remote_jid, fetch_messages, start_date, end_date, batch_size=500):
+        """Busca na API apenas os trechos do período ainda não sincronizados e os arquiva.
+
+        fetch_messages é um gerador no formato de GroupController.iter_messages. Os lotes já
+        gravados ficam no arquivo mesmo se a busca falhar, mas o trecho só é marcado como
+        sincronizado depois que o gerador chega ao fim; a próxima sincronização busca de novo.
+        Retorna a quantidade de mensagens novas gravadas.
+        """
+        novas = 0
+        for inicio, fim in self.missing_ranges(remote_jid, self._to_timestamp(start_date), self._to_timestamp(end_date)):
+            lote = []
+            trecho_inicio = datetime.fromtimestamp(inicio).strftime(FORMATO_DATA)
+            trecho_fim = datetime.fromtimestamp(fim).strftime(FORMATO_DATA)
+            for msg in fetch_messages(remote_jid, trecho_inicio, trecho_fim):
+                lote.append(msg)
+                if len(lote) >= batch_size:
+                    novas += self.save(lote)
+                    lote = []
+            novas += self.save(lote)
+            self._mark_synced(remote_jid, inicio, fim)
+        print(f"Arquivo local: {novas} mensagem(ns) nova(s) de {remote_jid}")
+        return novas
+
+    def get_messages(self, remote_jid, start_date, end_date):
+        """Lê do disco as mensagens do grupo no período, da mais recente para a mais antiga."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("""
+                SELECT raw FROM messages
+                WHERE remote_jid = ? AND message_timestamp BETWEEN ? AND ?
+                ORDER BY message_timestamp DESC
+            """, (remote_jid, self._to_timestamp(start_date), self._to_timestamp(end_date))).fetchall()
+        finally:
+            conn.close()
+        return [MessageSandeco(json.loads(raw)) for (raw,) in rows]
@@ -0,0 +1,206 @@
+import os
+import time
+import sqlite3
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+
+class OutboundQueue:
+    """Fila persistente (SQLite) de mensagens de saída.
+
+    Produtores apenas gravam a mensagem com enqueue, sem depender da rede; um worker drena a
+    fila em lotes, com backoff exponencial entre tentativas e deduplicação pela chave de
+    idempotência. Assim, um resumo já gerado nunca se perde por falha no envio.
+    """
+
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+    def __init__(self, db_path=None, max_attempts=8, base_delay=30, max_delay=3600, claim_timeout=300):
+        self.db_path = db_path or os.path.join(os.path.dirname(__file__), "outbound_queue.db")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.claim_timeout = claim_timeout
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS outbox (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        idempotency_key TEXT NOT NULL UNIQUE,
+                        number TEXT NOT NULL,
+                        text TEXT NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'pending',
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        next_attempt_at REAL NOT NULL,
+                        claimed_at REAL,
+                        last_error TEXT,
+                        created_at REAL NOT NULL,
+                        sent_at REAL
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at)")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(number, text):
+        """Chave de idempotência padrão: o mesmo texto para o mesmo destino é enviado uma única vez.
+
+        Produtores que repetem mensagens legítimas (como os resumos diários) devem passar a própria
+        chave a enqueue, baseada na identidade da execução (veja summary.summary_key).
+        """
+        return hashlib.sha256(f"{number}\0{text}".encode("utf-8")).hexdigest()
+
+    def enqueue(self, number, text, idempotency_key=None):
+        """Grava a mensagem na fila e retorna a chave de idempotência; mensagens repetidas são ignoradas."""
+        key = idempotency_key or self.make_key(number, text)
+        agora = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""
+                    INSERT OR IGNORE INTO outbox (idempotency_key, number, text, next_attempt_at, created_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (key, str(number), text, agora, agora))
+        finally:
+            conn.close()
+        return key
+
+    def claim_batch(self, limit):
+        """Reserva até `limit` mensagens vencidas para envio.
+
+        Mensagens reservadas por um worker que não terminou em claim_timeout voltam a ser elegíveis.
+        """
+        agora = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                rows = conn.execute("""
+                    SELECT id, number, text, attempts FROM outbox
+                    WHERE (status = ? AND next_attempt_at <= ?) OR (status = ? AND claimed_at < ?)
+                    ORDER BY id LIMIT ?
+                """, (self.PENDING, agora, self.SENDING, agora - self.claim_timeout, limit)).fetchall()
+                conn.executemany(
+                    "UPDATE outbox SET status = ?, claimed_at = ? WHERE id = ?",
+                    [(self.SENDING, agora, row[0]) for row in rows]
+                )
+            return rows
+        finally:
+            conn.close()
+
+    def mark_sent(self, message_id):
+        """Grava o status final, a data de envio e libera a reserva em uma única transação."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""
+                    UPDATE outbox SET status = ?, sent_at = ?, attempts = attempts + 1, last_error = NULL, claimed_at = NULL
+                    WHERE id = ?
+                """, (self.SENT, time.time(), message_id))
+        finally:
+            conn.close()
+
+    def mark_failed(self, message_id, attempts, error):
+        """Agenda uma nova tentativa com backoff exponencial ou marca a mensagem como falha definitiva."""
+        attempts += 1
+        status = self.FAILED if attempts >= self.max_attempts else self.PENDING
+        espera = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""
+                    UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, claimed_at = NULL
+                    WHERE id = ?
+                """, (status, attempts, time.time() + espera, str(error)[:500], message_id))
+        finally:
+            conn.close()
+        return status
+
+    @staticmethod
+    def _check_response(response):
+        """O cliente do Evolution devolve erros de envio como JSON em vez de lançar exceção."""
+        if isinstance(response, dict) and isinstance(response.get("status"), int) and response["status"] >= 400:
+            raise RuntimeError(f"Erro no envio: {response}")
+        return response
+
+    def _deliver(self, sender, row):
+        message_id, number, text, attempts = row
+        try:
+            self._check_response(sender.textMessage(number, text))
+            self.mark_sent(message_id)
+            return self.SENT
+        except Exception as e:
+            print(f"Falha ao enviar mensagem {message_id} para {number}: {e}")
+            return self.mark_failed(message_id, attempts, e)
+
+    def drain(self, sender=None, batch_size=10, workers=1):
+        """Envia as mensagens vencidas em lotes até esvaziar a fila; retorna a contagem por resultado."""
+        if sender is None:
+            from send_sandeco import SendSandeco
+            sender = SendSandeco()
+        contagem = {self.SENT: 0, self.PENDING: 0, self.FAILED: 0}
+        with ThreadPoolExecutor(workers, thread_name_prefix="outbox") as pool:
+            while True:
+                lote = self.claim_batch(batch_size)
+                if not lote:
+                    break
+                for status in pool.map(lambda row: self._deliver(sender, row), lote):
+                    contagem[status] += 1
+        if any(contagem.values()):
+            print(f"Fila de saída: {contagem[self.SENT]} enviada(s), {contagem[self.PENDING]} para nova tentativa, "
+                  f"{contagem[self.FAILED]} com falha definitiva")
+        return contagem
+
+    def get_status(self, idempotency_key):
+        """Retorna o status da mensagem com a chave informada, ou None se ela não existir."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT status FROM outbox WHERE idempotency_key = ?", (idempotency_key,)
+            ).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def pending_count(self):
+        """Quantidade de mensagens aguardando envio."""
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status IN (?, ?)", (self.PENDING, self.SENDING)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker que drena a fila de mensagens de saída.")
+    parser.add_argument("--loop", action="store_true", help="Continua drenando a fila a cada intervalo")
+    parser.add_argument("--interval", type=float, default=30, help="Intervalo entre drenagens, em segundos")
+    parser.add_argument("--batch-size", type=int, default=10)
+    args = parser.parse_args()
+
+    from send_sandeco import SendSandeco
+    queue = OutboundQueue()
+    sender = SendSandeco()
+    while True:
+        queue.drain(sender, batch_size=args.batch_size)
+        if not args.loop:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+import time
+from io import StringIO
+
+
+class PromptBuilder:
+    """Monta o texto das mensagens para o SummaryCrew em buffers, estimando os tokens à medida que escreve.
+
+    Quando o período ultrapassa token_budget, as mensagens são divididas em partes (chunks),
+    cada uma com o cabeçalho do período, para serem resumidas separadamente e combinadas depois.
+    Para cada parte também é guardada a sua identidade (IDs e textos das mensagens e a data da
+    janela), usada como chave do cache do LLM no lugar do texto, cujo cabeçalho traz a hora exata.
+    """
+
+    # Estimativa simples de tokens: em média ~4 caracteres por token
+    CHARS_PER_TOKEN = 4
+    # Incrementar ao mudar o formato do prompt, para invalidar as respostas já guardadas no cache
+    FORMAT_VERSION = 1
+
+    def __init__(self, data_inicial, data_final, token_budget=None):
+        self.data_inicial = data_inicial
+        self.data_final = data_final
+        self.token_budget = token_budget or int(os.getenv("SUMMARY_TOKEN_BUDGET", 100_000))
+        self.header = f"""
+    Dados sobre as mensagens do grupo
+    Data Inicial: {data_inicial}
+    Data Final: {data_final}
+
+    MENSAGENS DOS USUÁRIOS PARA O RESUMO:
+    --------------------------
+    """
+        self.header_tokens = self.estimate_tokens(self.header)
+        self._chunks = []
+        self._records = []
+        self._new_chunk()
+
+    @classmethod
+    def estimate_tokens(cls, text):
+        """Estimativa do número de tokens de um texto."""
+        return len(text) // cls.CHARS_PER_TOKEN + 1
+
+    def _new_chunk(self):
+        buffer = StringIO()
+        buffer.write(self.header)
+        self._chunks.append(buffer)
+        self._records.append([])
+        self._tokens = self.header_tokens
+        self._entries = 0
+
+    @staticmethod
+    def format_message(msg):
+        """Formata uma mensagem no layout usado pelo prompt."""
+        return f"""
+        Nome: *{msg.get_name()}*
+        Postagem: "{msg.get_text()}"
+        data: {time.strftime("%d/%m %H:%M", time.localtime(msg.message_timestamp))}'
+        """
+
+    def add(self, msg):
+        """Acrescenta uma mensagem, abrindo uma nova parte se o orçamento de tokens for excedido."""
+        entrada = self.format_message(msg)
+        tokens = self.estimate_tokens(entrada)
+        if self._entries and self._tokens + tokens > self.token_budget:
+            self._new_chunk()
+        self._chunks[-1].write(entrada)
+        self._records[-1].append([msg.message_id, msg.get_text()])
+        self._tokens += tokens
+        self._entries += 1
+
+    def add_all(self, msgs):
+        """Acrescenta as mensagens em ordem cronológica (a API as devolve da mais recente para a mais antiga)."""
+        for msg in reversed(msgs):
+            self.add(msg)
+        return self
+
+    def chunks(self):
+        """Retorna o texto de cada parte."""
+        return [buffer.getvalue() for buffer in self._chunks]
+
+    def cache_ids(self):
+        """Identidade de cada parte para o cache do LLM: versão do formato, data da janela e (ID, texto) das mensagens."""
+        return [
+            {"format": self.FORMAT_VERSION, "window": self.data_final[:10], "messages": records}
+            for records in self._records
+        ]
+
+    @property
+    def total_tokens(self):
+        """Estimativa de tokens somando todas as partes."""
+        return sum(self.estimate_tokens(chunk) for chunk in self.chunks())
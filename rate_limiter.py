@@ -0,0 +1,154 @@
+import os
+import time
+import threading
+from evolutionapi.exceptions import EvolutionAPIError
+
+
+class TokenBucket:
+    """Balde de tokens com taxa adaptativa.
+
+    Cada chamada consome um token; os tokens são repostos continuamente a `rate` por segundo
+    até `capacity`. Quando o servidor responde rate-overlimit a taxa é reduzida pela metade e
+    volta a crescer aos poucos a cada chamada bem-sucedida.
+    """
+
+    def __init__(self, rate, capacity):
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = self.base_rate / 16
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Bloqueia até haver um token disponível e retorna o tempo de espera em segundos."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                espera = (1 - self.tokens) / self.rate
+            time.sleep(espera)
+            waited += espera
+
+    def penalize(self):
+        """Reduz a taxa após uma resposta de rate-overlimit e esvazia o balde."""
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self.updated = time.monotonic()
+
+    def reward(self):
+        """Recupera gradualmente a taxa original após chamadas bem-sucedidas."""
+        with self.lock:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.1)
+
+
+class RateLimiter:
+    """Limitador compartilhado por todas as chamadas ao Evolution API, com um balde por endpoint.
+
+    Os orçamentos padrão podem ser alterados por variáveis de ambiente no formato
+    EVO_RATE_<ENDPOINT>="<requisições por segundo>,<rajada>", por exemplo EVO_RATE_SEND_TEXT="0.5,2".
+    """
+
+    DEFAULT_BUDGETS = {
+        "fetch_all_groups": (0.2, 1),
+        "get_messages": (2.0, 5),
+        "get_group_info": (1.0, 2),
+        "send_text": (1.0, 3),
+        "send_media": (0.5, 2),
+    }
+
+    def __init__(self, budgets=None, max_retries=4, base_delay=2):
+        self.budgets = dict(self.DEFAULT_BUDGETS)
+        self.budgets.update(budgets or {})
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.buckets = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _budget_from_env(endpoint, default):
+        valor = os.getenv(f"EVO_RATE_{endpoint.upper()}")
+        if not valor:
+            return default
+        rate, capacity = valor.split(",")
+        return float(rate), float(capacity)
+
+    def bucket(self, endpoint):
+        """Retorna (criando se necessário) o balde de tokens do endpoint."""
+        with self.lock:
+            if endpoint not in self.buckets:
+                rate, capacity = self._budget_from_env(endpoint, self.budgets.get(endpoint, (1.0, 1)))
+                self.buckets[endpoint] = TokenBucket(rate, capacity)
+                self.stats[endpoint] = {"calls": 0, "errors": 0, "rate_limited": 0, "wait_seconds": 0.0}
+            return self.buckets[endpoint]
+
+    @staticmethod
+    def is_rate_limited(value):
+        """Indica se uma exceção ou resposta da API corresponde a rate-overlimit."""
+        if isinstance(value, Exception):
+            return "rate-overlimit" in str(value)
+        if isinstance(value, dict) and "status" in value:
+            return "rate-overlimit" in str(value.get("response", "")) or "rate-overlimit" in str(value.get("error", ""))
+        return False
+
+    def _count(self, endpoint, key, amount=1):
+        with self.lock:
+            self.stats[endpoint][key] += amount
+
+    def call(self, endpoint, func, *args, **kwargs):
+        """Executa func respeitando o orçamento do endpoint e repetindo a chamada em caso de rate-overlimit."""
+        bucket = self.bucket(endpoint)
+        for attempt in range(self.max_retries):
+            self._count(endpoint, "wait_seconds", bucket.acquire())
+            self._count(endpoint, "calls")
+            try:
+                response = func(*args, **kwargs)
+            except EvolutionAPIError as e:
+                if not self.is_rate_limited(e) or attempt == self.max_retries - 1:
+                    self._count(endpoint, "errors")
+                    raise
+                response = e
+            if not self.is_rate_limited(response):
+                bucket.reward()
+                return response
+
+            self._count(endpoint, "rate_limited")
+            bucket.penalize()
+            if attempt == self.max_retries - 1:
+                break
+            wait_time = self.base_delay * (2 ** attempt)
+            print(f"Rate limit atingido em {endpoint}. Aguardando {wait_time} segundos...")
+            time.sleep(wait_time)
+        self._count(endpoint, "errors")
+        raise EvolutionAPIError(f"rate-overlimit persistente em {endpoint} após {self.max_retries} tentativas")
+
+    def metrics(self):
+        """Retorna as métricas por endpoint, incluindo a taxa atual de cada balde."""
+        with self.lock:
+            return {
+                endpoint: dict(stats, rate=self.buckets[endpoint].rate)
+                for endpoint, stats in self.stats.items()
+            }
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Retorna o RateLimiter compartilhado pelo processo."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
@@ -0,0 +1,18 @@
+import os
+from group_controller import GroupController
+
+
+def reconcile_scheduled_tasks():
+    """Sincroniza as tarefas agendadas com as configurações de resumo habilitadas.
+
+    Lê o agendador uma única vez, compara com as configurações e grava apenas as inserções,
+    atualizações e remoções necessárias em uma única escrita. Nos sistemas em que as tarefas
+    instaladas não podem ser lidas (Windows e macOS), todas as tarefas habilitadas são reinstaladas.
+    """
+    control = GroupController()
+    python_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "summary.py")
+    return control.reconcile_schedule(python_script, force=True)
+
+
+if __name__ == "__main__":
+    reconcile_scheduled_tasks()
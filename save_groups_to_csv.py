@@ -1,37 +1,21 @@
-import pandas as pd  
+import argparse
+from group import Group
 from group_controller import GroupController
 
-def save_groups_to_csv():
-    """Salva informações dos grupos em um arquivo CSV."""
+def save_groups_to_csv(output="group_info.csv", parquet=False):
+    """Salva informações dos grupos em um arquivo CSV (ou Parquet)."""
     control = GroupController()
     groups = control.fetch_groups()
 
-    group_data = []
-    
-    for group in groups:
-        group_data.append({
-            "group_id": group.group_id,
-            "name": group.name,
-            "subject_owner": group.subject_owner,
-            "subject_time": group.subject_time,
-            "picture_url": group.picture_url,
-            "size": group.size,
-            "creation": group.creation,
-            "owner": group.owner,
-            "restrict": group.restrict,
-            "announce": group.announce,
-            "is_community": group.is_community,
-            "is_community_announce": group.is_community_announce,
-            "dias": group.dias,
-            "horario": group.horario,
-            "enabled": group.enabled,
-            "is_links": group.is_links,
-            "is_names": group.is_names
-        })
-
-    df = pd.DataFrame(group_data)
-    df.to_csv("group_info.csv", index=False)
-    print("Group information saved to group_info.csv")
+    if parquet:
+        Group.to_parquet(groups, output)
+    else:
+        Group.to_dataframe(groups).to_csv(output, index=False)
+    print(f"Group information saved to {output}")
 
 if __name__ == "__main__":
-    save_groups_to_csv()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Exporta as informações dos grupos.")
+    parser.add_argument("--output", default=None, help="Arquivo de saída (padrão: group_info.csv ou group_info.parquet)")
+    parser.add_argument("--parquet", action="store_true", help="Exporta em Parquet (requer pyarrow)")
+    args = parser.parse_args()
+    save_groups_to_csv(args.output or ("group_info.parquet" if args.parquet else "group_info.csv"), args.parquet)
@@ -0,0 +1,452 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import platform
+import threading
+import subprocess
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from task_scheduler import TaskScheduled
+
+
+def make_job(task_name, script, horario, args=None):
+    """Descreve uma tarefa diária: executa `python script args` no horário HH:MM.
+
+    Por padrão os argumentos são `--task_name <task_name>`, o mesmo formato usado por TaskScheduled.
+    """
+    return {
+        "task_name": task_name,
+        "script": os.path.abspath(script),
+        "horario": horario,
+        "args": list(args) if args is not None else ["--task_name", task_name],
+    }
+
+
+SLOT_PREFIX = "ResumoSlot_"
+
+
+def slot_task_name(horario):
+    """Nome da tarefa que resume os grupos do horário HH:MM (ResumoSlot_HHMM)."""
+    return SLOT_PREFIX + horario.replace(":", "")
+
+
+def make_slot_job(horario, script, jitter=0):
+    """Tarefa de horário: um único processo resume todos os grupos habilitados em `horario`.
+
+    O nome é ResumoSlot_HHMM e o script (summary_batch.py) recebe `--slot HH:MM`; com `jitter`
+    o início é atrasado aleatoriamente em até esse número de segundos.
+    """
+    task_name = slot_task_name(horario)
+    args = ["--slot", horario, "--task_name", task_name]
+    if jitter:
+        args += ["--jitter", str(int(jitter))]
+    return make_job(task_name, script, horario, args)
+
+
+class SchedulerBackend(ABC):
+    """Interface dos agendadores de tarefas. `apply` grava várias alterações de uma só vez."""
+
+    @abstractmethod
+    def apply(self, upserts=(), deletes=()):
+        """Cria ou substitui as tarefas de `upserts` (dicionários de make_job) e remove as de `deletes` (nomes)."""
+
+    def create_task(self, task_name, script, horario, args=None):
+        self.apply(upserts=[make_job(task_name, script, horario, args)])
+
+    def delete_task(self, task_name):
+        self.apply(deletes=[task_name])
+
+    @abstractmethod
+    def list_tasks(self):
+        """Exibe as tarefas instaladas."""
+
+    def installed(self):
+        """Retorna as tarefas instaladas como {task_name: job}, ou None se o agendador não puder ser lido."""
+        return None
+
+    @staticmethod
+    def diff(desired, installed, prefix):
+        """Compara as tarefas desejadas com as instaladas cujo nome começa com `prefix` (texto ou tupla).
+
+        Retorna (inserções, atualizações, remoções); tarefas idênticas não aparecem em nenhuma lista.
+        """
+        desejadas = {job["task_name"]: job for job in desired}
+        inserts, updates = [], []
+        for task_name, job in desejadas.items():
+            atual = installed.get(task_name)
+            if atual is None:
+                inserts.append(job)
+            elif (atual["horario"], atual["script"], atual["args"]) != (job["horario"], job["script"], job["args"]):
+                updates.append(job)
+        deletes = [task_name for task_name in installed if task_name.startswith(prefix) and task_name not in desejadas]
+        return inserts, updates, deletes
+
+    def reconcile(self, desired, prefix, previous=None, force=False):
+        """Deixa instaladas exatamente as tarefas `desired` entre as que começam com `prefix`.
+
+        Lê o agendador uma vez e aplica apenas as diferenças em uma única operação.
+        Quando as tarefas instaladas não podem ser lidas (schtasks, launchctl), compara com
+        `previous` (as tarefas desejadas antes de uma alteração de configuração), se informado;
+        sem ele, só reinstala tudo com `force=True` e, caso contrário, não altera nada, pois
+        recriar as tarefas no macOS as executa na hora e no Windows abre um schtasks por tarefa.
+        Retorna a contagem de inserções, atualizações, remoções e tarefas já corretas.
+        """
+        installed = self.installed()
+        if installed is None and previous is not None:
+            installed = {job["task_name"]: job for job in previous}
+        if installed is None:
+            if not force:
+                print("Aviso: não é possível ler as tarefas instaladas neste sistema; agenda não alterada "
+                      "(use reconcile_scheduled_tasks.py para reinstalar todas as tarefas).")
+                return {"inserts": 0, "updates": 0, "deletes": 0, "unchanged": 0, "skipped": True}
+            self.apply(upserts=desired)
+            return {"inserts": len(desired), "updates": 0, "deletes": 0, "unchanged": 0}
+        inserts, updates, deletes = self.diff(desired, installed, prefix)
+        self.apply(upserts=inserts + updates, deletes=deletes)
+        return {"inserts": len(inserts), "updates": len(updates), "deletes": len(deletes),
+                "unchanged": len(desired) - len(inserts) - len(updates)}
+
+
+class OSSchedulerBackend(SchedulerBackend):
+    """Agenda as tarefas no sistema operacional (crontab, schtasks ou launchctl).
+
+    No Linux, um lote inteiro de alterações é aplicado com uma leitura e uma escrita do crontab;
+    nos demais sistemas cada tarefa continua sendo criada ou removida por TaskScheduled.
+    """
+
+    LOCK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".crontab.lock")
+
+    @contextmanager
+    def _crontab_lock(self):
+        """Serializa a leitura e a escrita do crontab entre processos deste projeto."""
+        import fcntl
+        with open(self.LOCK_FILE, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def read_crontab():
+        result = subprocess.run(["crontab", "-l"], capture_output=True, text=True)
+        # crontab -l retorna erro quando o usuário ainda não tem crontab
+        return result.stdout.splitlines() if result.returncode == 0 else []
+
+    @staticmethod
+    def write_crontab(lines):
+        conteudo = "\n".join(lines) + "\n" if lines else ""
+        subprocess.run(["crontab", "-"], input=conteudo, text=True, check=True)
+
+    @staticmethod
+    def cron_task_name(line):
+        """Extrai o valor de --task_name de uma linha do crontab, ou None."""
+        partes = line.split()
+        if line.lstrip().startswith("#") or "--task_name" not in partes:
+            return None
+        i = partes.index("--task_name")
+        return partes[i + 1] if i + 1 < len(partes) else None
+
+    @classmethod
+    def parse_cron_line(cls, line):
+        """Converte uma linha diária do crontab com --task_name em job; retorna None para as demais linhas."""
+        task_name = cls.cron_task_name(line)
+        if task_name is None:
+            return None
+        partes = line.split()
+        if len(partes) < 8 or partes[2:5] != ["*", "*", "*"] or not (partes[0].isdigit() and partes[1].isdigit()):
+            return None
+        return {
+            "task_name": task_name,
+            "horario": f"{int(partes[1]):02d}:{int(partes[0]):02d}",
+            "python": partes[5],
+            "script": partes[6],
+            "args": partes[7:],
+        }
+
+    @staticmethod
+    def cron_line(job, python_executable):
+        hora, minuto = job["horario"].split(":")
+        return f"{int(minuto)} {int(hora)} * * * {python_executable} {job['script']} {' '.join(job['args'])}"
+
+    def apply(self, upserts=(), deletes=()):
+        upserts, deletes = list(upserts), list(deletes)
+        if not upserts and not deletes:
+            return
+        for job in upserts:
+            TaskScheduled.validate_python_script(job["script"])
+        if platform.system() != "Linux":
+            for task_name in deletes:
+                try:
+                    TaskScheduled.delete_task(task_name)
+                except Exception as e:
+                    print(f"Aviso: não foi possível remover a tarefa {task_name}: {e}")
+            for job in upserts:
+                try:
+                    TaskScheduled.delete_task(job["task_name"])
+                except Exception:
+                    pass
+                TaskScheduled.create_task(job["task_name"], job["script"], schedule_type="DAILY",
+                                          time=job["horario"], args=job["args"])
+            return
+
+        with self._crontab_lock():
+            self._write_changes(self.read_crontab(), upserts, deletes)
+
+    def _write_changes(self, linhas, upserts, deletes):
+        """Aplica as alterações sobre as linhas já lidas do crontab e grava o resultado de uma só vez."""
+        removidas = set(deletes) | {job["task_name"] for job in upserts}
+        python_executable = TaskScheduled.get_python_executable()
+        linhas = [line for line in linhas if self.cron_task_name(line) not in removidas]
+        linhas.extend(self.cron_line(job, python_executable) for job in upserts)
+        self.write_crontab(linhas)
+        print(f"Crontab atualizado: {len(upserts)} tarefa(s) criada(s)/atualizada(s), {len(deletes)} removida(s)")
+
+    def installed(self, linhas=None):
+        if platform.system() != "Linux":
+            return None
+        jobs = (self.parse_cron_line(line) for line in (linhas if linhas is not None else self.read_crontab()))
+        return {job["task_name"]: job for job in jobs if job}
+
+    def reconcile(self, desired, prefix):
+        if platform.system() != "Linux":
+            return super().reconcile(desired, prefix)
+        # Uma leitura do crontab para comparar e, se houver diferenças, uma escrita
+        for job in desired:
+            TaskScheduled.validate_python_script(job["script"])
+        with self._crontab_lock():
+            linhas = self.read_crontab()
+            inserts, updates, deletes = self.diff(desired, self.installed(linhas), prefix)
+            if inserts or updates or deletes:
+                self._write_changes(linhas, inserts + updates, deletes)
+        return {"inserts": len(inserts), "updates": len(updates), "deletes": len(deletes),
+                "unchanged": len(desired) - len(inserts) - len(updates)}
+
+    def list_tasks(self):
+        TaskScheduled.list_tasks()
+
+
+class TimerWheel:
+    """Roda de temporização diária com uma posição por minuto do dia (1440 posições)."""
+
+    SLOTS = 24 * 60
+
+    def __init__(self):
+        self.slots = [set() for _ in range(self.SLOTS)]
+        self.positions = {}
+
+    @staticmethod
+    def slot_of(horario):
+        hora, minuto = horario.split(":")
+        return int(hora) * 60 + int(minuto)
+
+    def add(self, task_name, horario):
+        self.remove(task_name)
+        posicao = self.slot_of(horario)
+        self.slots[posicao].add(task_name)
+        self.positions[task_name] = posicao
+
+    def remove(self, task_name):
+        posicao = self.positions.pop(task_name, None)
+        if posicao is not None:
+            self.slots[posicao].discard(task_name)
+
+    @classmethod
+    def minute_of(cls, moment):
+        """Minuto de relógio contínuo entre dias (ordinal da data * 1440 + minuto do dia)."""
+        return moment.toordinal() * cls.SLOTS + moment.hour * 60 + moment.minute
+
+    def due(self, last_minute, current_minute):
+        """Tarefas das posições após last_minute até current_minute (inclusive), em minutos de minute_of.
+
+        Se o relógio voltar (fim do horário de verão, correção de NTP), nada vence; um salto para
+        frente percorre no máximo um dia, para que cada tarefa dispare uma única vez. Quem chama
+        deve manter last_minute sem recuar (veja InProcessSchedulerBackend.run_forever).
+        """
+        passos = min(current_minute - last_minute, self.SLOTS)
+        vencidas = []
+        for passo in range(1, passos + 1):
+            vencidas.extend(self.slots[(last_minute + passo) % self.SLOTS])
+        return vencidas
+
+
+class InProcessSchedulerBackend(SchedulerBackend):
+    """Agendador próprio: tabela de tarefas persistente (SQLite) e um processo executor com TimerWheel.
+
+    Criar, alterar ou remover tarefas é apenas uma transação no banco, sem processos externos;
+    `python scheduler_backend.py --run` mantém a roda carregada e dispara cada tarefa no seu horário.
+    """
+
+    def __init__(self, db_path=None, max_running=None):
+        self.db_path = db_path or os.path.join(os.path.dirname(__file__), "scheduler_jobs.db")
+        self.max_running = max_running or int(os.getenv("SCHEDULER_MAX_RUNNING", 4))
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        task_name TEXT PRIMARY KEY,
+                        script TEXT NOT NULL,
+                        horario TEXT NOT NULL,
+                        args TEXT NOT NULL,
+                        last_run TEXT
+                    )
+                """)
+                conn.execute("CREATE TABLE IF NOT EXISTS jobs_meta (key TEXT PRIMARY KEY, value INTEGER)")
+                conn.execute("INSERT OR IGNORE INTO jobs_meta (key, value) VALUES ('version', 0)")
+        finally:
+            conn.close()
+
+    def apply(self, upserts=(), deletes=()):
+        upserts, deletes = list(upserts), list(deletes)
+        if not upserts and not deletes:
+            return
+        for job in upserts:
+            TaskScheduled.validate_python_script(job["script"])
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("DELETE FROM jobs WHERE task_name = ?", [(task_name,) for task_name in deletes])
+                conn.executemany("""
+                    INSERT INTO jobs (task_name, script, horario, args) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (task_name) DO UPDATE SET
+                        script = excluded.script, horario = excluded.horario, args = excluded.args
+                """, [(job["task_name"], job["script"], job["horario"], "\0".join(job["args"])) for job in upserts])
+                # O executor recarrega a roda quando a versão muda
+                conn.execute("UPDATE jobs_meta SET value = value + 1 WHERE key = 'version'")
+        finally:
+            conn.close()
+        print(f"Agenda atualizada: {len(upserts)} tarefa(s) criada(s)/atualizada(s), {len(deletes)} removida(s)")
+
+    def jobs(self):
+        """Retorna as tarefas cadastradas como dicionários."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT * FROM jobs ORDER BY horario, task_name").fetchall()
+        finally:
+            conn.close()
+        return [
+            dict(task_name=row["task_name"], script=row["script"], horario=row["horario"],
+                 args=row["args"].split("\0") if row["args"] else [], last_run=row["last_run"])
+            for row in rows
+        ]
+
+    def installed(self):
+        return {job["task_name"]: job for job in self.jobs()}
+
+    def version(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT value FROM jobs_meta WHERE key = 'version'").fetchone()[0]
+        finally:
+            conn.close()
+
+    def list_tasks(self):
+        jobs = self.jobs()
+        print(f"Tarefas agendadas no agendador interno ({self.db_path}):")
+        for job in jobs:
+            print(f"{job['horario']}  {job['task_name']}  {job['script']} {' '.join(job['args'])}  "
+                  f"(última execução: {job['last_run'] or '-'})")
+        return jobs
+
+    def _mark_run(self, task_name):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("UPDATE jobs SET last_run = ? WHERE task_name = ?",
+                             (datetime.now().isoformat(timespec="seconds"), task_name))
+        finally:
+            conn.close()
+
+    def _load_wheel(self):
+        wheel = TimerWheel()
+        jobs = {job["task_name"]: job for job in self.jobs()}
+        for job in jobs.values():
+            wheel.add(job["task_name"], job["horario"])
+        return wheel, jobs
+
+    @staticmethod
+    def _launch(job):
+        """Inicia o processo da tarefa."""
+        return subprocess.Popen([sys.executable, job["script"], *job["args"]])
+
+    def run_forever(self, stop_event=None, poll_interval=5, clock=datetime.now):
+        """Executa as tarefas nos seus horários até stop_event ser sinalizado.
+
+        A marca do último minuto processado só avança: se o relógio voltar (fim do horário de
+        verão, correção de NTP), os minutos repetidos não disparam as tarefas outra vez.
+        """
+        stop_event = stop_event or threading.Event()
+        wheel, jobs = self._load_wheel()
+        versao = self.version()
+        running = []
+        ultimo_minuto = TimerWheel.minute_of(clock())
+        print(f"Agendador interno iniciado com {len(jobs)} tarefa(s).")
+        while not stop_event.is_set():
+            nova_versao = self.version()
+            if nova_versao != versao:
+                wheel, jobs = self._load_wheel()
+                versao = nova_versao
+                print(f"Agenda recarregada: {len(jobs)} tarefa(s).")
+
+            agora = clock()
+            minuto = TimerWheel.minute_of(agora)
+            if minuto > ultimo_minuto:
+                for task_name in wheel.due(ultimo_minuto, minuto):
+                    running = [proc for proc in running if proc.poll() is None]
+                    while len(running) >= self.max_running and not stop_event.is_set():
+                        time.sleep(1)
+                        running = [proc for proc in running if proc.poll() is None]
+                    job = jobs[task_name]
+                    print(f"[{agora:%H:%M}] Executando {task_name}")
+                    running.append(self._launch(job))
+                    self._mark_run(task_name)
+                ultimo_minuto = minuto
+            stop_event.wait(poll_interval)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Retorna o agendador configurado em SCHEDULER_BACKEND ("os", padrão, ou "inprocess")."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            backend = os.getenv("SCHEDULER_BACKEND", "os").lower()
+            if backend == "inprocess":
+                _scheduler = InProcessSchedulerBackend()
+            elif backend == "os":
+                _scheduler = OSSchedulerBackend()
+            else:
+                raise ValueError(f"SCHEDULER_BACKEND inválido: {backend}")
+        return _scheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agendador interno de tarefas (SCHEDULER_BACKEND=inprocess).")
+    parser.add_argument("--run", action="store_true", help="Executa as tarefas cadastradas nos seus horários")
+    parser.add_argument("--list", action="store_true", help="Lista as tarefas cadastradas")
+    args = parser.parse_args()
+
+    backend = InProcessSchedulerBackend()
+    if args.list or not args.run:
+        backend.list_tasks()
+    if args.run:
+        backend.run_forever()
+
+
+if __name__ == "__main__":
+    main()
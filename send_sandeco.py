@@ -1,23 +1,22 @@
 import os
-import time
-from dotenv import load_dotenv
-from evolutionapi.client import EvolutionClient
 from evolutionapi.models.message import TextMessage, MediaMessage
+from rate_limiter import get_rate_limiter
+from evolution_client import get_settings, get_evolution_client
+import tracing
 
 class SendSandeco:
     
     def __init__(self) -> None:
-        load_dotenv()
-        self.evo_api_token = os.getenv("EVO_API_TOKEN")
-        self.evo_instance_id = os.getenv("EVO_INSTANCE_NAME")
-        self.evo_instance_token = os.getenv("EVO_INSTANCE_TOKEN")
-        self.evo_base_url = os.getenv("EVO_BASE_URL")
-
-        self.client = EvolutionClient(
-            base_url=self.evo_base_url,
-            api_token=self.evo_api_token
-        )
+        settings = get_settings()
+        self.evo_api_token = settings["api_token"]
+        self.evo_instance_id = settings["instance_id"]
+        self.evo_instance_token = settings["instance_token"]
+        self.evo_base_url = settings["base_url"]
+
+        self.client = get_evolution_client()
+        self.rate_limiter = get_rate_limiter()
 
+    @tracing.traced("send_sandeco.textMessage")
     def textMessage(self, number, msg, mentions=[]):
         """Envia uma mensagem de texto para o número especificado."""
         text_message = TextMessage(
@@ -26,15 +25,16 @@ class SendSandeco:
             mentioned=mentions
         )
 
-        time.sleep(10)
-
-        response = self.client.messages.send_text(
+        response = self.rate_limiter.call(
+            "send_text",
+            self.client.messages.send_text,
             self.evo_instance_id,
             text_message,
             self.evo_instance_token
         )
         return response
 
+    @tracing.traced("send_sandeco.PDF")
     def PDF(self, number, pdf_file, caption=""):
         """Envia um arquivo PDF para o número especificado com uma legenda opcional."""
         if not os.path.exists(pdf_file):
@@ -49,13 +49,16 @@ class SendSandeco:
             media=""
         )
         
-        self.client.messages.send_media(
+        self.rate_limiter.call(
+            "send_media",
+            self.client.messages.send_media,
             self.evo_instance_id,
             media_message,
             self.evo_instance_token,
             pdf_file
         )
 
+    @tracing.traced("send_sandeco.audio")
     def audio(self, number, audio_file):
         """Envia um arquivo de áudio para o número especificado."""
         if not os.path.exists(audio_file):
@@ -68,7 +71,9 @@ class SendSandeco:
             "caption": ""
         }
             
-        self.client.messages.send_whatsapp_audio(
+        self.rate_limiter.call(
+            "send_media",
+            self.client.messages.send_whatsapp_audio,
             self.evo_instance_id,
             audio_message,
             self.evo_instance_token,
@@ -77,6 +82,7 @@ class SendSandeco:
                     
         return "Áudio enviado"
 
+    @tracing.traced("send_sandeco.image")
     def image(self, number, image_file, caption=""):
         """Envia uma imagem para o número especificado com uma legenda opcional."""
         if not os.path.exists(image_file):
@@ -91,7 +97,9 @@ class SendSandeco:
             media=""
         )
 
-        self.client.messages.send_media(
+        self.rate_limiter.call(
+            "send_media",
+            self.client.messages.send_media,
             self.evo_instance_id,
             media_message,
             self.evo_instance_token,
@@ -100,6 +108,7 @@ class SendSandeco:
         
         return "Imagem enviada"
 
+    @tracing.traced("send_sandeco.video")
     def video(self, number, video_file, caption=""):
         """Envia um vídeo para o número especificado com uma legenda opcional."""
         if not os.path.exists(video_file):
@@ -114,7 +123,9 @@ class SendSandeco:
             media=""
         )
 
-        self.client.messages.send_media(
+        self.rate_limiter.call(
+            "send_media",
+            self.client.messages.send_media,
             self.evo_instance_id,
             media_message,
             self.evo_instance_token,
@@ -123,6 +134,7 @@ class SendSandeco:
         
         return "Vídeo enviado"
 
+    @tracing.traced("send_sandeco.document")
     def document(self, number, document_file, caption=""):
         """Envia um documento para o número especificado com uma legenda opcional."""
         if not os.path.exists(document_file):
@@ -137,7 +149,9 @@ class SendSandeco:
             media=""
         )
 
-        self.client.messages.send_media(
+        self.rate_limiter.call(
+            "send_media",
+            self.client.messages.send_media,
             self.evo_instance_id,
             media_message,
             self.evo_instance_token,
@@ -146,11 +160,12 @@ class SendSandeco:
         
         return "Documento enviado"
 
-# Instancia um objeto SendSandeco para utilização dos métodos de envio de mensagens
-sender = SendSandeco()
+if __name__ == "__main__":
+    # Instancia um objeto SendSandeco para utilização dos métodos de envio de mensagens
+    sender = SendSandeco()
 
-# Define o número de telefone/grupo para o envio (identificado pelo formato com @g.us)
-celular = "120363391798069472@g.us"
+    # Define o número de telefone/grupo para o envio (identificado pelo formato com @g.us)
+    celular = "120363391798069472@g.us"
 
-# Envia uma mensagem de texto para o número/grupo definido com o conteúdo "teste de mensagem"
-sender.textMessage(number=celular, msg="teste de mensagem")
\ No newline at end of file
+    # Envia uma mensagem de texto para o número/grupo definido com o conteúdo "teste de mensagem"
+    sender.textMessage(number=celular, msg="teste de mensagem")
@@ -0,0 +1,165 @@
+import os
+import asyncio
+import mimetypes
+import aiohttp
+from rate_limiter import get_rate_limiter
+from evolution_client import get_settings
+
+
+class AsyncSendSandeco:
+    """Variante assíncrona do SendSandeco para enviar mídias a muitos destinatários ao mesmo tempo.
+
+    Uma única ClientSession (com pool de conexões keep-alive) é reaproveitada em todos os envios,
+    os arquivos são lidos do disco em blocos durante o upload, sem carregá-los inteiros na memória,
+    e os envios em massa respeitam um limite configurável de concorrência.
+
+    Uso:
+        async with AsyncSendSandeco() as sender:
+            resultados = await sender.send_to_many(numeros, sender.PDF, "relatorio.pdf", caption="Resumo")
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, concurrency=None, timeout=60):
+        settings = get_settings()
+        self.evo_api_token = settings["api_token"]
+        self.evo_instance_id = settings["instance_id"]
+        self.evo_instance_token = settings["instance_token"]
+        self.evo_base_url = settings["base_url"].rstrip("/")
+        self.concurrency = concurrency or int(os.getenv("SEND_CONCURRENCY", 5))
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.rate_limiter = get_rate_limiter()
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Fecha a sessão HTTP e as conexões do pool."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _headers(self):
+        return {"apikey": self.evo_instance_token or self.evo_api_token}
+
+    def _url(self, endpoint):
+        return f"{self.evo_base_url}/{endpoint}/{self.evo_instance_id}"
+
+    async def _read_chunks(self, path):
+        """Lê o arquivo em blocos sem bloquear o event loop."""
+        with open(path, "rb") as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    async def _post(self, endpoint, limiter_key, build_request):
+        """Faz o POST respeitando o RateLimiter compartilhado e repetindo em caso de rate-overlimit."""
+        if self.session is None:
+            raise RuntimeError("Use 'async with AsyncSendSandeco()' antes de enviar.")
+        bucket = self.rate_limiter.bucket(limiter_key)
+        for attempt in range(self.rate_limiter.max_retries):
+            await asyncio.to_thread(bucket.acquire)
+            async with self.session.post(self._url(endpoint), headers=self._headers(), **build_request()) as response:
+                data = await response.json(content_type=None)
+            if not self.rate_limiter.is_rate_limited(data):
+                bucket.reward()
+                return data
+            bucket.penalize()
+            await asyncio.sleep(self.rate_limiter.base_delay * (2 ** attempt))
+        raise RuntimeError(f"rate-overlimit persistente em {endpoint}")
+
+    async def textMessage(self, number, msg):
+        """Envia uma mensagem de texto para o número especificado."""
+        return await self._post(
+            "message/sendText", "send_text",
+            lambda: {"json": {"number": str(number), "text": msg}}
+        )
+
+    async def send_media(self, number, media_file, mediatype, mimetype, caption=""):
+        """Envia um arquivo de mídia com upload em streaming a partir do disco."""
+        if not os.path.exists(media_file):
+            raise FileNotFoundError(f"Arquivo '{media_file}' não encontrado.")
+
+        def build_request():
+            # O FormData é recriado a cada tentativa, pois o gerador do arquivo só pode ser consumido uma vez
+            form = aiohttp.FormData()
+            form.add_field("number", str(number))
+            form.add_field("mediatype", mediatype)
+            form.add_field("mimetype", mimetype)
+            form.add_field("caption", caption)
+            form.add_field("fileName", os.path.basename(media_file))
+            form.add_field(
+                "file",
+                self._read_chunks(media_file),
+                filename=os.path.basename(media_file),
+                content_type=mimetypes.guess_type(media_file)[0] or "application/octet-stream"
+            )
+            return {"data": form}
+
+        return await self._post("message/sendMedia", "send_media", build_request)
+
+    async def PDF(self, number, pdf_file, caption=""):
+        """Envia um arquivo PDF para o número especificado com uma legenda opcional."""
+        return await self.send_media(number, pdf_file, "document", "application/pdf", caption)
+
+    async def audio(self, number, audio_file):
+        """Envia um arquivo de áudio como mensagem de voz do WhatsApp (message/sendWhatsAppAudio)."""
+        if not os.path.exists(audio_file):
+            raise FileNotFoundError(f"Arquivo '{audio_file}' não encontrado.")
+
+        def build_request():
+            # Mesmos campos do SendSandeco.audio; o arquivo segue em streaming a partir do disco
+            form = aiohttp.FormData()
+            form.add_field("number", str(number))
+            form.add_field("mediatype", "audio")
+            form.add_field("mimetype", "audio/mpeg")
+            form.add_field("caption", "")
+            form.add_field(
+                "file",
+                self._read_chunks(audio_file),
+                filename="file",
+                content_type=mimetypes.guess_type(audio_file)[0] or "application/octet-stream"
+            )
+            return {"data": form}
+
+        return await self._post("message/sendWhatsAppAudio", "send_media", build_request)
+
+    async def image(self, number, image_file, caption=""):
+        """Envia uma imagem para o número especificado com uma legenda opcional."""
+        return await self.send_media(number, image_file, "image", "image/jpeg", caption)
+
+    async def video(self, number, video_file, caption=""):
+        """Envia um vídeo para o número especificado com uma legenda opcional."""
+        return await self.send_media(number, video_file, "video", "video/mp4", caption)
+
+    async def document(self, number, document_file, caption=""):
+        """Envia um documento para o número especificado com uma legenda opcional."""
+        return await self.send_media(
+            number, document_file, "document",
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document", caption
+        )
+
+    async def send_to_many(self, numbers, send_method, *args, **kwargs):
+        """Executa send_method para cada destinatário, com no máximo `concurrency` envios simultâneos.
+
+        Retorna um dicionário número -> {"ok": bool, "response" ou "error"}.
+        """
+        semaforo = asyncio.Semaphore(self.concurrency)
+
+        async def enviar(number):
+            async with semaforo:
+                try:
+                    return number, {"ok": True, "response": await send_method(number, *args, **kwargs)}
+                except Exception as e:
+                    return number, {"ok": False, "error": str(e)}
+
+        resultados = await asyncio.gather(*(enviar(number) for number in numbers))
+        return dict(resultados)
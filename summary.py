@@ -1,82 +1,140 @@
 import sys
 import os
-import time
 import argparse
 from datetime import datetime, timedelta
 from group_controller import GroupController
-from summary_crew import SummaryCrew
-from send_sandeco import SendSandeco
+from prompt_builder import PromptBuilder
+from outbound_queue import OutboundQueue
+import tracing
 
-# Cria o parser para argumentos de linha de comando
-parser = argparse.ArgumentParser()
-parser.add_argument("--task_name", required=True, help="Nome da tarefa agendada")
-args = parser.parse_args()
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
 
-group_id = args.task_name.split("_")[1]
 
-control = GroupController()
-df = control.load_data_by_group(group_id)
-nome = control.find_group_by_id(group_id).name
+def group_id_from_task(task_name):
+    """Extrai o ID do grupo do nome da tarefa agendada (ResumoGrupo_<group_id>)."""
+    return task_name.split("_")[1]
 
-# Garante que as informações do resumo do grupo estejam inseridas no arquivo group_summary.csv
-if not df:
-    control.update_summary(group_id, '22:00', True, False, False, __file__)
-    df = control.load_data_by_group(group_id)
 
-print("EXECUTANDO TAREFA AGENDADA")
-print(f"Resumo do grupo : {nome}")
-
-if df and df.get('enabled', False):
-    data_atual = datetime.now()
+def summary_window(now=None):
+    """Retorna o período do resumo (últimas 24 horas) como strings no formato FORMATO_DATA."""
+    data_atual = now or datetime.now()
     data_anterior = data_atual - timedelta(days=1)
+    return data_anterior.strftime(FORMATO_DATA), data_atual.strftime(FORMATO_DATA)
 
-    formato = "%Y-%m-%d %H:%M:%S"
-    data_atual_formatada = data_atual.strftime(formato)
-    data_anterior_formatada = data_anterior.strftime(formato)
 
-    print(f"Data atual: {data_atual_formatada}")
-    print(f"Data de 1 dia anterior: {data_anterior_formatada}")
+def summary_key(group_id, data_final):
+    """Chave de idempotência do envio: um resumo por grupo e por dia (data final da janela).
 
-    msgs = control.get_messages(group_id, data_anterior_formatada, data_atual_formatada)
+    Depende só da identidade da execução, e não do texto, para que um resumo igual ao de um dia
+    anterior (por exemplo, "nenhuma mensagem") seja enviado de novo, enquanto uma nova tentativa
+    no mesmo dia não duplica o envio.
+    """
+    return f"{group_id}:{data_final[:10]}"
 
-    cont = len(msgs)
-    print(f"Total de mensagens: {cont}")
 
-    time.sleep(20)
+def build_prompt(msgs, data_inicial, data_final, token_budget=None):
+    """Monta o texto com as mensagens do período, dividido em partes que respeitam o orçamento de tokens.
 
-    pull_msg = f"""
-    Dados sobre as mensagens do grupo
-    Data Inicial: {data_anterior_formatada}
-    Data Final: {data_atual_formatada}
-    
-    MENSAGENS DOS USUÁRIOS PARA O RESUMO:
-    --------------------------
+    Retorna (partes, identidades das partes para o cache do LLM); veja PromptBuilder.cache_ids.
     """
+    builder = PromptBuilder(data_inicial, data_final, token_budget).add_all(msgs)
+    print(f"Prompt com ~{builder.total_tokens} tokens em {len(builder.chunks())} parte(s)")
+    return builder.chunks(), builder.cache_ids()
 
-    for msg in reversed(msgs):
-        pull_msg += f"""
-        Nome: *{msg.get_name()}*
-        Postagem: "{msg.get_text()}"  
-        data: {time.strftime("%d/%m %H:%M", time.localtime(msg.message_timestamp))}'     
-        """
-
-    print(pull_msg)
-    
-    inputs = {
-        "msgs": pull_msg
-    }
-    
-    summary_crew = SummaryCrew()
-    resposta = summary_crew.kickoff(inputs=inputs)
-
-    evo_send = SendSandeco()
-    evo_send.textMessage(group_id, resposta)
 
+def write_log(nome, group_id, mensagem, data=None):
+    """Registra uma linha no arquivo log_summary.txt."""
     log_path = os.path.dirname(__file__)
     nome_arquivo = os.path.join(log_path, "log_summary.txt")
+    data = data or datetime.now()
 
     with open(nome_arquivo, "a", encoding="utf-8") as arquivo:
-        log = f"[{data_atual}] [INFO] [GRUPO: {nome}] [GROUP_ID: {group_id}] - Mensagem: Resumo gerado e enviado com sucesso!"
+        log = f"[{data}] [INFO] [GRUPO: {nome}] [GROUP_ID: {group_id}] - Mensagem: {mensagem}\n"
         arquivo.write(log)
-else:
-    print("Grupo não encontrado ou resumo não está habilitado para este grupo.")
\ No newline at end of file
+
+
+@tracing.traced("summary.run")
+def run_summary(group_id, control, summary_crew=None, queue=None, config=None):
+    """Gera o resumo de um grupo e o grava na fila de saída.
+
+    Recebe o controlador e, opcionalmente, instâncias já criadas de SummaryCrew e OutboundQueue
+    e a configuração do grupo, permitindo que um processo de longa duração as reutilize.
+    O envio fica a cargo de quem drena a fila, então uma falha de rede nunca descarta o resumo.
+    Retorna True quando o resumo é gerado e enfileirado; False quando o resumo não está habilitado
+    ou não há mensagens no período.
+    """
+    tracing.set_attribute("group_id", group_id)
+    df = config if config is not None else control.load_data_by_group(group_id)
+    # Busca só os dados deste grupo (cache local ou findGroupInfos), sem listar todos os grupos
+    grupo = control.get_group_metadata(group_id)
+    nome = grupo.name if grupo else group_id
+
+    # Garante que as informações do resumo do grupo estejam cadastradas
+    if not df:
+        control.update_summary(group_id, '22:00', True, False, False, __file__)
+        df = control.load_data_by_group(group_id)
+
+    print("EXECUTANDO TAREFA AGENDADA")
+    print(f"Resumo do grupo : {nome}")
+
+    if not (df and df.get('enabled', False)):
+        print("Grupo não encontrado ou resumo não está habilitado para este grupo.")
+        return False
+
+    data_anterior_formatada, data_atual_formatada = summary_window()
+
+    print(f"Data atual: {data_atual_formatada}")
+    print(f"Data de 1 dia anterior: {data_anterior_formatada}")
+
+    msgs = control.get_archived_messages(group_id, data_anterior_formatada, data_atual_formatada)
+
+    cont = len(msgs)
+    print(f"Total de mensagens: {cont}")
+    tracing.set_attribute("messages", cont)
+
+    if cont == 0:
+        # Sem mensagens não há o que resumir; o CrewAI nem chega a ser carregado
+        write_log(nome, group_id, "Nenhuma mensagem no período; resumo não gerado.")
+        return False
+
+    with tracing.span("summary.build_prompt", messages=cont) as span:
+        chunks, cache_ids = build_prompt(msgs, data_anterior_formatada, data_atual_formatada)
+        span.set_attribute("chunks", len(chunks))
+
+    for pull_msg in chunks:
+        print(pull_msg)
+
+    if summary_crew is None:
+        # O CrewAI é a dependência mais pesada; só é carregado aqui, quando há mensagens para resumir
+        from summary_crew import SummaryCrew
+        summary_crew = SummaryCrew()
+    resposta, cache = summary_crew.summarize_with_status(chunks, cache_ids=cache_ids)
+    write_log(nome, group_id, f"Cache do LLM: {cache['hit']} hit(s), {cache['miss']} miss(es)")
+
+    with tracing.span("summary.enqueue", chars=len(resposta)):
+        queue = queue or OutboundQueue()
+        queue.enqueue(group_id, resposta, idempotency_key=summary_key(group_id, data_atual_formatada))
+
+    write_log(nome, group_id, "Resumo gerado e enfileirado para envio!")
+    return True
+
+
+def main():
+    # Cria o parser para argumentos de linha de comando
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--task_name", required=True, help="Nome da tarefa agendada")
+    args = parser.parse_args()
+
+    group_id = group_id_from_task(args.task_name)
+
+    control = GroupController()
+    queue = OutboundQueue()
+    run_summary(group_id, control, queue=queue)
+
+    # Entrega o que estiver na fila (inclusive resumos de execuções anteriores que falharam no envio)
+    from send_sandeco import SendSandeco
+    queue.drain(SendSandeco())
+
+
+if __name__ == "__main__":
+    main()
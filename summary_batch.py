@@ -0,0 +1,169 @@
+import os
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from group_controller import GroupController
+from summary_crew import SummaryCrew
+from send_sandeco import SendSandeco
+from summary import summary_window, summary_key, build_prompt, write_log
+from rate_limiter import get_rate_limiter
+from evolution_client import get_evolution_client
+from outbound_queue import OutboundQueue
+import tracing
+
+
+class SummaryBatch:
+    """Executa os resumos de vários grupos em um único processo, em três estágios concorrentes.
+
+    - Busca de mensagens: pool de threads limitado a fetch_workers.
+    - Geração do resumo: no máximo llm_workers chamadas simultâneas ao LLM.
+    - Envio: cada resumo é gravado na fila de saída assim que fica pronto; ao final, a fila é drenada
+      uma única vez por send_workers threads, limitadas pelo RateLimiter compartilhado do Evolution API.
+
+    Assim, grupos agendados no mesmo horário terminam aproximadamente no tempo do mais lento.
+    """
+
+    def __init__(self, control=None, fetch_workers=4, llm_workers=2, send_workers=1):
+        self.control = control or GroupController()
+        self.fetch_workers = fetch_workers
+        self.llm_workers = llm_workers
+        self.send_workers = send_workers
+        self.sender = SendSandeco()
+        self.summary_crew = SummaryCrew()
+        self.queue = OutboundQueue()
+        self.cache_status = {}
+        self.windows = {}
+
+    def resolve_groups(self, group_ids=None, slot=None):
+        """Retorna as configurações dos grupos a processar: os IDs informados ou todos os habilitados no horário."""
+        store = self.control.summary_store
+        if group_ids:
+            configs = {}
+            for group_id in group_ids:
+                resumo = store.get(group_id)
+                if resumo and resumo["enabled"]:
+                    configs[group_id] = resumo
+                else:
+                    print(f"Grupo {group_id} não encontrado ou resumo não está habilitado.")
+            return configs
+        return {resumo["group_id"]: resumo for resumo in store.enabled(horario=slot)}
+
+    def fetch(self, group_id):
+        """Busca as mensagens do período e monta as partes do prompt do grupo."""
+        with tracing.span("summary_batch.fetch", group_id=group_id) as span:
+            data_inicial, data_final = summary_window()
+            self.windows[group_id] = data_final
+            msgs = self.control.get_archived_messages(group_id, data_inicial, data_final)
+            print(f"[BATCH] {group_id}: {len(msgs)} mensagens")
+            chunks, cache_ids = build_prompt(msgs, data_inicial, data_final)
+            span.set_attribute("messages", len(msgs))
+            span.set_attribute("chunks", len(chunks))
+            return chunks, cache_ids
+
+    def summarize(self, group_id, prompt):
+        """Gera o resumo a partir das partes do prompt já montadas, guardando o uso do cache do LLM."""
+        with tracing.span("summary_batch.summarize", group_id=group_id):
+            chunks, cache_ids = prompt
+            resposta, cache = self.summary_crew.summarize_with_status(chunks, cache_ids=cache_ids)
+        self.cache_status[group_id] = cache
+        return resposta
+
+    def send(self, group_id, resposta):
+        """Grava o resumo na fila de saída e retorna a chave de idempotência; a entrega fica para drain."""
+        with tracing.span("summary_batch.send", group_id=group_id):
+            return self.queue.enqueue(group_id, resposta, idempotency_key=summary_key(group_id, self.windows[group_id]))
+
+    def drain(self, keys):
+        """Drena a fila uma única vez com send_workers threads; retorna o status final de cada chave."""
+        with tracing.span("summary_batch.drain", messages=len(keys)):
+            self.queue.drain(self.sender, workers=self.send_workers)
+            return {group_id: self.queue.get_status(key) for group_id, key in keys.items()}
+
+    @tracing.traced("summary_batch.run")
+    def run(self, configs):
+        """Processa os grupos e retorna um dicionário group_id -> status."""
+        if not configs:
+            print("Nenhum grupo para processar.")
+            return {}
+
+        tracing.set_attribute("groups", len(configs))
+        inicio = time.perf_counter()
+        resultados = {}
+        with ThreadPoolExecutor(self.fetch_workers, thread_name_prefix="fetch") as fetch_pool, \
+                ThreadPoolExecutor(self.llm_workers, thread_name_prefix="llm") as llm_pool:
+            fetches = {fetch_pool.submit(tracing.propagate(self.fetch), group_id): group_id for group_id in configs}
+            resumos = {}
+            for future in as_completed(fetches):
+                group_id = fetches[future]
+                try:
+                    resumos[llm_pool.submit(tracing.propagate(self.summarize), group_id, future.result())] = group_id
+                except Exception as e:
+                    resultados[group_id] = f"erro na busca: {e}"
+
+            envios = {}
+            for future in as_completed(resumos):
+                group_id = resumos[future]
+                try:
+                    resposta = future.result()
+                except Exception as e:
+                    resultados[group_id] = f"erro no resumo: {e}"
+                    continue
+                try:
+                    envios[group_id] = self.send(group_id, resposta)
+                except Exception as e:
+                    resultados[group_id] = f"erro no envio: {e}"
+
+        if envios:
+            try:
+                for group_id, status in self.drain(envios).items():
+                    resultados[group_id] = "ok" if status == OutboundQueue.SENT else f"na fila de saída ({status})"
+            except Exception as e:
+                for group_id in envios:
+                    resultados[group_id] = f"erro no envio: {e}"
+
+        for group_id, status in resultados.items():
+            grupo = self.control.get_group_metadata(group_id)
+            nome = grupo.name if grupo else "Nome não encontrado"
+            print(f"[BATCH] {nome} ({group_id}): {status}")
+            cache = self.cache_status.get(group_id)
+            if cache:
+                write_log(nome, group_id, f"Cache do LLM: {cache['hit']} hit(s), {cache['miss']} miss(es)")
+            if status == "ok":
+                write_log(nome, group_id, "Resumo gerado e enviado com sucesso!")
+        print(f"[BATCH] {len(configs)} grupo(s) processado(s) em {time.perf_counter() - inicio:.2f}s")
+        print(f"[BATCH] Métricas do Evolution API: {get_rate_limiter().metrics()}")
+        for endpoint, hist in get_evolution_client().latency.metrics().items():
+            print(f"[BATCH] Latência {endpoint}: {hist['count']} req, p50 {hist['p50']}s, p95 {hist['p95']}s, máx {hist['max']:.2f}s")
+        return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera e envia os resumos de vários grupos de uma vez.")
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument("--groups", nargs="+", help="IDs dos grupos a resumir")
+    grupo.add_argument("--slot", help="Resume todos os grupos habilitados neste horário (HH:MM)")
+    parser.add_argument("--fetch-workers", type=int, default=int(os.getenv("SUMMARY_FETCH_WORKERS", 4)))
+    parser.add_argument("--llm-workers", type=int, default=int(os.getenv("SUMMARY_LLM_WORKERS", 2)))
+    parser.add_argument("--send-workers", type=int, default=int(os.getenv("SUMMARY_SEND_WORKERS", 1)))
+    parser.add_argument("--jitter", type=float, default=0,
+                        help="Atrasa o início em até N segundos, espalhando tarefas agendadas no mesmo minuto")
+    parser.add_argument("--task_name", help="Nome da tarefa agendada que iniciou o lote (ResumoSlot_HHMM)")
+    args = parser.parse_args()
+
+    if args.jitter > 0:
+        espera = random.uniform(0, args.jitter)
+        print(f"[BATCH] Aguardando {espera:.1f}s (jitter) antes de iniciar...")
+        time.sleep(espera)
+
+    batch = SummaryBatch(
+        fetch_workers=args.fetch_workers,
+        llm_workers=args.llm_workers,
+        send_workers=args.send_workers
+    )
+    configs = batch.resolve_groups(group_ids=args.groups, slot=args.slot)
+    batch.run(configs)
+
+
+if __name__ == "__main__":
+    main()
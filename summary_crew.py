@@ -1,31 +1,40 @@
-from dotenv import load_dotenv
+import os
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from crewai import Agent, Task, Crew, Process, LLM
+from llm_cache import get_llm_cache
+from evolution_client import load_env
+import tracing
 
-class SummaryCrew:
-    """
-    Classe para organizar um agente, tarefa e execução de resumos de mensagens do WhatsApp.
-    """
+# Template de saída compartilhado pela tarefa de resumo e pela etapa de combinação das partes
+TEMPLATE = r"""<template>
+*Resumo do Grupo📝 - <Data ou Período>*
 
-    def __init__(self):
-        load_dotenv()
-        self.llm = "gemini/gemini-2.0-flash"
-        self.create_crew()
+*<Tópico Principal> <Emoji relacionado> - <Horário>*
 
-    def create_crew(self):
-        self.agent = Agent(
-            role="Assistente de Resumos",
-            goal="Criar resumos organizados e objetivos de mensagens de WhatsApp.",
-            backstory=(
-                "Você é um assistente de IA especializado em analisar e organizar informações "
-                "extraídas de mensagens de WhatsApp, garantindo clareza e objetividade."
-            ),
-            verbose=True,
-            memory=False,
-            llm=self.llm
-        )
+- *Participantes:* <Nomes dos usuários envolvidos>  
+- *Resumo:* <Descrição do tópico discutido, incluindo detalhes importantes e ações relevantes>  
+
+*Dúvidas, Erros e suas Soluções ❓ - <Horário>*
+
+- *Solicitado por:* <Nome do participante que levantou a dúvida ou relatou o erro>  
+- *Respondido por:* <Nome(s) dos participantes que ofereceram soluções ou respostas>
+- *Resumo:* <Descrição do problema ou dúvida e as soluções ou respostas apresentadas.> 
+
+*Resumo geral do período 📊:*
+- <Resumo curto e objetivo sobre o tom geral das interações ou assuntos discutidos no período.>
+
+*Links do Dia🔗:*
+- <Caso sejam compartilhados links importantes, liste-os aqui com data e contexto.>
+
+*Conclusão🔚:*
+- <Conclua destacando o ambiente do grupo ou a produtividade das interações.>
+</template>
+"""
 
-        self.task = Task(
-            description=r"""
+# Descrição da tarefa de resumo; {msgs} é preenchido pelo CrewAI a cada execução
+SUMMARY_DESCRIPTION = r"""
 Você é um assistente de IA especializado 
 em criar resumos organizados e objetivos 
 de mensagens em grupos de WhatsApp. 
@@ -47,58 +56,207 @@ Importante:
     - Conclusão
 - Quando não houver informações sobre um tópico simplesmente não coloque o tópico.
 
-<template>
-*Resumo do Grupo📝 - <Data ou Período>*
+""" + TEMPLATE + r"""
+Mensagens do grupo para análise:
 
-*<Tópico Principal> <Emoji relacionado> - <Horário>*
+<msgs>
+{msgs}
+</msgs>
+            """
 
-- *Participantes:* <Nomes dos usuários envolvidos>  
-- *Resumo:* <Descrição do tópico discutido, incluindo detalhes importantes e ações relevantes>  
+# Descrição da etapa de redução que combina os resumos parciais de um período dividido em partes
+MERGE_DESCRIPTION = r"""
+Você recebeu resumos parciais de um mesmo grupo de WhatsApp, 
+cada um cobrindo uma parte consecutiva do mesmo período, 
+delimitados por <resumos>. 
+Combine-os em um único resumo usando o templete delimitado por <template>.
 
-*Dúvidas, Erros e suas Soluções ❓ - <Horário>*
+Importante:
+- Junte tópicos repetidos e mantenha a ordem cronológica dos horários.
+- Retire os placeholders < > do texto. 
+- Deve haver somente um tópico de cada seção do template no resumo final.
+- Quando não houver informações sobre um tópico simplesmente não coloque o tópico.
 
-- *Solicitado por:* <Nome do participante que levantou a dúvida ou relatou o erro>  
-- *Respondido por:* <Nome(s) dos participantes que ofereceram soluções ou respostas>
-- *Resumo:* <Descrição do problema ou dúvida e as soluções ou respostas apresentadas.> 
+""" + TEMPLATE + r"""
+Resumos parciais para combinar:
 
-*Resumo geral do período 📊:*
-- <Resumo curto e objetivo sobre o tom geral das interações ou assuntos discutidos no período.>
+<resumos>
+{resumos}
+</resumos>
+            """
 
-*Links do Dia🔗:*
-- <Caso sejam compartilhados links importantes, liste-os aqui com data e contexto.>
+class SummaryCrew:
+    """
+    Motor reutilizável de resumos de mensagens do WhatsApp com CrewAI.
 
-*Conclusão🔚:*
-- <Conclua destacando o ambiente do grupo ou a produtividade das interações.>
-</template>
+    O grafo Agent/Task/Crew é montado uma única vez por configuração (modelo e etapa de resumo ou combinação)
+    e reaproveitado nas chamadas seguintes. Como uma Crew não deve ser executada por duas threads
+    ao mesmo tempo, os grafos ficam em um pool protegido por lock: cada execução retira um grafo
+    livre da configuração (ou monta um novo, se todos estiverem em uso) e o devolve ao terminar.
+    Assim uma única instância pode ser compartilhada por todos os workers de um daemon ou de um
+    lote, e o número de grafos montados fica limitado ao paralelismo máximo, não ao de chamadas.
+    """
 
-Mensagens do grupo para análise:
+    def __init__(self, llm=None, quiet=None):
+        """
+        Args:
+            llm (str): Modelo usado pelo agente (padrão: gemini/gemini-2.0-flash).
+            quiet (bool): Desliga o rastreamento verbose do CrewAI. Se omitido, usa SUMMARY_CREW_QUIET.
+        """
+        load_env()
+        self.llm = llm or "gemini/gemini-2.0-flash"
+        if quiet is None:
+            quiet = os.getenv("SUMMARY_CREW_QUIET", "").lower() in ("1", "true", "sim", "yes")
+        self.quiet = quiet
+        self.cache = get_llm_cache()
+        self._lock = threading.Lock()
+        self._free = {}
 
-<msgs>
-{msgs}
-</msgs>
-            """,
+    def create_agent(self):
+        return Agent(
+            role="Assistente de Resumos",
+            goal="Criar resumos organizados e objetivos de mensagens de WhatsApp.",
+            backstory=(
+                "Você é um assistente de IA especializado em analisar e organizar informações "
+                "extraídas de mensagens de WhatsApp, garantindo clareza e objetividade."
+            ),
+            verbose=not self.quiet,
+            memory=False,
+            llm=self.llm
+        )
+
+    def create_crew(self, description):
+        """Cria a Crew da tarefa de resumo para a descrição informada."""
+        agent = self.create_agent()
+        task = Task(
+            description=description,
             expected_output=(
                 "Um resumo segmentado de acordo com o template fornecido, contendo apenas informações "
                 "relevantes extraídas das mensagens fornecidas."
             ),
-            agent=self.agent,
+            agent=agent,
+        )
+        return Crew(
+            agents=[agent],
+            tasks=[task],
+            process=Process.sequential,
+            verbose=not self.quiet,
         )
 
-        self.crew = Crew(
-            agents=[self.agent],
-            tasks=[self.task],
+    def create_merge_crew(self, description):
+        """Cria a Crew que combina resumos parciais (etapa de redução) em um único resumo."""
+        agent = self.create_agent()
+        task = Task(
+            description=description,
+            expected_output=(
+                "Um único resumo segmentado de acordo com o template fornecido, combinando os resumos parciais."
+            ),
+            agent=agent,
+        )
+        return Crew(
+            agents=[agent],
+            tasks=[task],
             process=Process.sequential,
+            verbose=not self.quiet,
         )
 
+    @contextmanager
+    def _graph(self, merge):
+        """Empresta um (crew, descrição) livre da configuração, montando um novo só se não houver nenhum."""
+        key = (self.llm, merge)
+        with self._lock:
+            livres = self._free.setdefault(key, [])
+            grafo = livres.pop() if livres else None
+        if grafo is None:
+            description = MERGE_DESCRIPTION if merge else SUMMARY_DESCRIPTION
+            crew = self.create_merge_crew(description) if merge else self.create_crew(description)
+            grafo = (crew, description)
+        try:
+            yield grafo
+        finally:
+            with self._lock:
+                self._free[key].append(grafo)
+
+    def _run_cached(self, crew, template, inputs, cache_id=None):
+        """Executa a crew consultando antes o cache de respostas; retorna (resultado, "hit" ou "miss").
+
+        Com `cache_id` (identidade da parte, veja PromptBuilder.cache_ids) a chave é montada a partir
+        dele em vez das entradas, cujo cabeçalho traz a hora exata da execução.
+        """
+        key = self.cache.make_key(self.llm, template, cache_id if cache_id is not None else inputs)
+        with tracing.span("summary_crew.llm", cache_key=key[:12]) as span:
+            result = self.cache.get(key)
+            if result is not None:
+                print(f"[LLM CACHE] hit {key[:12]}")
+                span.set_attribute("cache", "hit")
+                return result, "hit"
+            print(f"[LLM CACHE] miss {key[:12]}")
+            span.set_attribute("cache", "miss")
+            result = crew.kickoff(inputs=inputs).raw
+            self.cache.put(key, result)
+            return result, "miss"
+
     def kickoff(self, inputs):
         """
         Executa o processo de resumo de mensagens.
 
         Args:
-            inputs (str): Mensagens de WhatsApp para processar.
+            inputs (dict): Entradas da tarefa; {"msgs": <mensagens de WhatsApp para processar>}.
 
         Returns:
             str: O resumo gerado no formato esperado.
         """
-        result = self.crew.kickoff(inputs=inputs).raw
-        return result
\ No newline at end of file
+        result, _ = self.kickoff_with_status(inputs)
+        return result
+
+    def kickoff_with_status(self, inputs, cache_id=None):
+        """Executa o resumo como kickoff, retornando também se a resposta veio do cache."""
+        with tracing.span("summary_crew.kickoff", chars=sum(len(str(v)) for v in inputs.values())):
+            with self._graph(False) as (crew, description):
+                return self._run_cached(crew, description, inputs, cache_id)
+
+    def summarize(self, chunks, max_workers=None, cache_ids=None):
+        """Resume o período a partir das partes montadas pelo PromptBuilder; veja summarize_with_status."""
+        result, _ = self.summarize_with_status(chunks, max_workers, cache_ids)
+        return result
+
+    @tracing.traced("summary_crew.summarize")
+    def summarize_with_status(self, chunks, max_workers=None, cache_ids=None):
+        """
+        Resume o período a partir das partes montadas pelo PromptBuilder.
+
+        Com uma única parte equivale a kickoff. Com várias, cada parte é resumida em paralelo
+        e os resumos parciais são combinados em uma etapa final.
+
+        Args:
+            chunks (list[str]): Partes do texto das mensagens.
+            max_workers (int): Máximo de partes resumidas ao mesmo tempo.
+            cache_ids (list[dict]): Identidade de cada parte para o cache do LLM (PromptBuilder.cache_ids).
+
+        Returns:
+            tuple[str, dict]: O resumo final e a contagem de acertos e falhas do cache de respostas.
+        """
+        tracing.set_attribute("chunks", len(chunks))
+        cache_ids = cache_ids or [None] * len(chunks)
+        if len(chunks) == 1:
+            result, status = self.kickoff_with_status({"msgs": chunks[0]}, cache_ids[0])
+            return result, {"hit": int(status == "hit"), "miss": int(status == "miss")}
+
+        max_workers = max_workers or int(os.getenv("SUMMARY_CHUNK_WORKERS", 4))
+        print(f"Período dividido em {len(chunks)} partes; resumindo em paralelo...")
+        with ThreadPoolExecutor(max_workers, thread_name_prefix="chunk") as pool:
+            # propagate mantém os spans das partes no mesmo trace, embora rodem em outras threads
+            execucoes = list(pool.map(
+                tracing.propagate(lambda chunk, cache_id: self.kickoff_with_status({"msgs": chunk}, cache_id)),
+                chunks, cache_ids
+            ))
+        parciais = [result for result, _ in execucoes]
+
+        resumos = "\n\n".join(
+            f"--- Parte {i} de {len(parciais)} ---\n{parcial}" for i, parcial in enumerate(parciais, 1)
+        )
+        with tracing.span("summary_crew.merge", parts=len(parciais)):
+            with self._graph(True) as (crew, description):
+                result, status = self._run_cached(crew, description, {"resumos": resumos})
+        statuses = [status for _, status in execucoes] + [status]
+        return result, {"hit": statuses.count("hit"), "miss": statuses.count("miss")}
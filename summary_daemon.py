@@ -0,0 +1,123 @@
+import heapq
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+from group_controller import GroupController
+from summary_crew import SummaryCrew
+from send_sandeco import SendSandeco
+from summary import run_summary, write_log
+from outbound_queue import OutboundQueue
+
+
+class SummaryDaemon:
+    """Processo de longa duração que dispara os resumos de todos os grupos habilitados.
+
+    Substitui o modelo de um processo do cron por grupo: a configuração é lida uma única vez,
+    GroupController, SummaryCrew e SendSandeco ficam aquecidos em memória e cada grupo é
+    executado no seu horário a partir de um heap de temporizadores. Os resumos vão para a
+    fila de saída, drenada por uma thread própria.
+    """
+
+    # Intervalo máximo de espera entre verificações do heap, em segundos
+    MAX_WAIT = 60
+    # Intervalo entre drenagens da fila de saída quando não há jobs novos, em segundos
+    DRAIN_INTERVAL = 30
+
+    def __init__(self):
+        self.control = GroupController()
+        self.summary_crew = SummaryCrew()
+        self.sender = SendSandeco()
+        self.queue = OutboundQueue()
+        self.heap = []
+        self.configs = {}
+        self.latencies = {}
+        self._stop = threading.Event()
+        self._drain_now = threading.Event()
+
+    @staticmethod
+    def next_run(horario, now=None):
+        """Calcula a próxima ocorrência de um horário "HH:MM" a partir de agora."""
+        now = now or datetime.now()
+        hora, minuto = (int(parte) for parte in horario.split(":"))
+        proxima = now.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+        if proxima <= now:
+            proxima += timedelta(days=1)
+        return proxima
+
+    def load_schedule(self):
+        """Lê a configuração dos grupos uma vez e monta o heap de execuções."""
+        self.heap = []
+        self.configs = {}
+        for resumo in self.control.summary_store.enabled():
+            group_id = resumo["group_id"]
+            self.configs[group_id] = resumo
+            heapq.heappush(self.heap, (self.next_run(resumo["horario"]), group_id))
+        print(f"{len(self.heap)} grupo(s) agendado(s) no daemon.")
+        return self.heap
+
+    def run_job(self, group_id):
+        """Executa o resumo de um grupo e registra a latência do job."""
+        resumo = self.configs[group_id]
+        inicio = time.perf_counter()
+        status = "ok"
+        try:
+            if not run_summary(group_id, self.control, self.summary_crew, self.queue, config=resumo):
+                status = "ignorado"
+        except Exception as e:
+            status = "erro"
+            print(f"Erro ao executar o resumo do grupo {group_id}: {e}")
+        latencia = time.perf_counter() - inicio
+        self.report_latency(group_id, latencia, status)
+        self._drain_now.set()
+        return latencia
+
+    def report_latency(self, group_id, latencia, status):
+        """Guarda a latência do job e a registra no console e no log."""
+        self.latencies.setdefault(group_id, []).append(latencia)
+        print(f"[DAEMON] Grupo {group_id} - status: {status} - latência: {latencia:.2f}s")
+        write_log("DAEMON", group_id, f"Job finalizado ({status}) em {latencia:.2f}s")
+
+    def drain_loop(self):
+        """Drena a fila de saída após cada job e, periodicamente, para repetir envios que falharam."""
+        while not self._stop.is_set():
+            self._drain_now.wait(self.DRAIN_INTERVAL)
+            self._drain_now.clear()
+            try:
+                self.queue.drain(self.sender)
+            except Exception as e:
+                print(f"Erro ao drenar a fila de saída: {e}")
+
+    def run_forever(self):
+        """Aguarda o próximo horário do heap, executa o job e o reagenda para o dia seguinte."""
+        if not self.heap:
+            self.load_schedule()
+        threading.Thread(target=self.drain_loop, name="outbox-drain", daemon=True).start()
+        while self.heap and not self._stop.is_set():
+            proxima, group_id = self.heap[0]
+            espera = (proxima - datetime.now()).total_seconds()
+            if espera > 0:
+                self._stop.wait(min(espera, self.MAX_WAIT))
+                continue
+            heapq.heappop(self.heap)
+            self.run_job(group_id)
+            horario = self.configs[group_id]["horario"]
+            heapq.heappush(self.heap, (self.next_run(horario), group_id))
+        print("Daemon de resumos finalizado.")
+
+    def stop(self, *_):
+        """Interrompe o laço principal do daemon."""
+        self._stop.set()
+        self._drain_now.set()
+
+
+def main():
+    daemon = SummaryDaemon()
+    signal.signal(signal.SIGINT, daemon.stop)
+    signal.signal(signal.SIGTERM, daemon.stop)
+    daemon.load_schedule()
+    daemon.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import os
+import csv
+import sqlite3
+
+
+class SummaryStore:
+    """Armazena as configurações de resumo dos grupos em uma tabela SQLite indexada por group_id.
+
+    Substitui as releituras e reescritas completas do group_summary.csv: consultas por grupo são
+    pontuais, alterações afetam uma única linha e cada operação roda em uma transação.
+    Na primeira execução o conteúdo do CSV existente é importado.
+    """
+
+    COLUMNS = ["group_id", "horario", "enabled", "is_links", "is_names"]
+    BOOL_COLUMNS = ("enabled", "is_links", "is_names")
+
+    def __init__(self, db_path=None, csv_file=None):
+        paths_this = os.path.dirname(__file__)
+        self.db_path = db_path or os.path.join(paths_this, "group_summary.db")
+        self.csv_file = csv_file or os.path.join(paths_this, "group_summary.csv")
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        """Cria a tabela, se necessário, e importa o CSV legado uma única vez."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS group_summary (
+                        group_id TEXT PRIMARY KEY,
+                        horario TEXT NOT NULL DEFAULT '22:00',
+                        enabled INTEGER NOT NULL DEFAULT 0,
+                        is_links INTEGER NOT NULL DEFAULT 0,
+                        is_names INTEGER NOT NULL DEFAULT 0
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_group_summary_slot ON group_summary (enabled, horario)")
+                conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)")
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                imported = conn.execute("SELECT value FROM store_meta WHERE key = 'csv_imported'").fetchone()
+                if not imported:
+                    self._import_csv(conn)
+                    conn.execute("INSERT INTO store_meta (key, value) VALUES ('csv_imported', '1')")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _parse_bool(value):
+        if isinstance(value, str):
+            return value.strip().lower() in ("true", "1", "sim", "yes")
+        return bool(value)
+
+    def _import_csv(self, conn):
+        if not os.path.exists(self.csv_file):
+            return
+        with open(self.csv_file, newline="", encoding="utf-8") as f:
+            rows = [
+                (
+                    row["group_id"],
+                    row.get("horario") or "22:00",
+                    self._parse_bool(row.get("enabled", False)),
+                    self._parse_bool(row.get("is_links", False)),
+                    self._parse_bool(row.get("is_names", False)),
+                )
+                for row in csv.DictReader(f)
+                if row.get("group_id")
+            ]
+        conn.executemany(
+            "INSERT OR IGNORE INTO group_summary (group_id, horario, enabled, is_links, is_names) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        print(f"{len(rows)} configuração(ões) importada(s) de {self.csv_file}")
+
+    def _to_dict(self, row):
+        resumo = dict(row)
+        for column in self.BOOL_COLUMNS:
+            resumo[column] = bool(resumo[column])
+        return resumo
+
+    def get(self, group_id):
+        """Retorna a configuração de um grupo como dicionário, ou None se ele não estiver cadastrado."""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM group_summary WHERE group_id = ?", (group_id,)).fetchone()
+            return self._to_dict(row) if row else None
+        finally:
+            conn.close()
+
+    def all(self):
+        """Retorna todas as configurações cadastradas."""
+        conn = self._connect()
+        try:
+            return [self._to_dict(row) for row in conn.execute("SELECT * FROM group_summary ORDER BY rowid")]
+        finally:
+            conn.close()
+
+    def enabled(self, horario=None):
+        """Retorna as configurações habilitadas, opcionalmente apenas as de um horário."""
+        conn = self._connect()
+        try:
+            if horario:
+                rows = conn.execute(
+                    "SELECT * FROM group_summary WHERE enabled = 1 AND horario = ? ORDER BY rowid", (horario,)
+                )
+            else:
+                rows = conn.execute("SELECT * FROM group_summary WHERE enabled = 1 ORDER BY rowid")
+            return [self._to_dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def upsert(self, group_id, horario, enabled, is_links, is_names):
+        """Insere ou atualiza a configuração de um único grupo."""
+        self.upsert_many([dict(group_id=group_id, horario=horario, enabled=enabled,
+                               is_links=is_links, is_names=is_names)])
+
+    def upsert_many(self, configs):
+        """Insere ou atualiza as configurações de vários grupos em uma única transação."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT INTO group_summary (group_id, horario, enabled, is_links, is_names)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (group_id) DO UPDATE SET
+                        horario = excluded.horario,
+                        enabled = excluded.enabled,
+                        is_links = excluded.is_links,
+                        is_names = excluded.is_names
+                """, [
+                    (resumo["group_id"], resumo["horario"], bool(resumo["enabled"]),
+                     bool(resumo["is_links"]), bool(resumo["is_names"]))
+                    for resumo in configs
+                ])
+        finally:
+            conn.close()
+
+    def delete(self, group_id):
+        """Remove a configuração de um grupo; retorna True se alguma linha foi removida."""
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute("DELETE FROM group_summary WHERE group_id = ?", (group_id,))
+                return cursor.rowcount > 0
+        finally:
+            conn.close()
@@ -27,11 +27,15 @@ class TaskScheduled:
             raise EnvironmentError("Não foi possível localizar o executável do Python no sistema.") from e
 
     @staticmethod
-    def create_task(task_name, python_script_path, schedule_type='DAILY', time='22:00'):
+    def create_task(task_name, python_script_path, schedule_type='DAILY', time='22:00', args=None):
         """Cria uma tarefa agendada de acordo com o sistema operacional.
         Para cada sistema, constrói o comando ou arquivo de configuração necessário.
+        Os argumentos do script são `args` ou, por padrão, `--task_name <task_name>`
+        (tarefas de horário usam, por exemplo, `--slot 22:00 --task_name ResumoSlot_2200`).
         """
         TaskScheduled.validate_python_script(python_script_path)
+        args = list(args) if args else ['--task_name', task_name]
+        script_args = ' '.join(args)
 
         python_executable = TaskScheduled.get_python_executable()
         os_name = platform.system()
@@ -42,16 +46,17 @@ class TaskScheduled:
                 'schtasks',
                 '/Create',
                 '/TN', task_name,
-                '/TR', f'"{python_executable}" "{python_script_path}" --task_name {task_name}',
+                '/TR', f'"{python_executable}" "{python_script_path}" {script_args}',
                 '/SC', schedule_type.upper(),
                 '/ST', time,
             ]
         elif os_name == "Linux":
             # Em Linux, adiciona uma entrada no crontab. O comando concatena entradas existentes com a nova.
-            command = f'(crontab -l 2>/dev/null ; echo "{time.split(":")[1]} {time.split(":")[0]} * * * {python_executable} {python_script_path} --task_name {task_name}") | crontab -'
+            command = f'(crontab -l 2>/dev/null ; echo "{time.split(":")[1]} {time.split(":")[0]} * * * {python_executable} {python_script_path} {script_args}") | crontab -'
         elif os_name == "Darwin":  
             # Em macOS, cria um arquivo plist para agendar a tarefa pelo launchctl
             safe_task_name = task_name.replace('@', '_').replace('.', '_')
+            args_xml = "".join(f"\n        <string>{arg}</string>" for arg in args)
             plist_content = f"""<?xml version="1.0" encoding="UTF-8"?>
 <!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
 <plist version="1.0">
@@ -62,11 +67,9 @@ class TaskScheduled:
     <array>
         <string>/usr/bin/osascript</string>
         <string>-e</string>
-        <string>tell application "Terminal" to do script "{python_executable} {python_script_path} --task_name {task_name}" </string>
+        <string>tell application "Terminal" to do script "{python_executable} {python_script_path} {script_args}" </string>
         <string>{python_executable}</string>
-        <string>{python_script_path}</string>
-        <string>--task_name</string>
-        <string>{task_name}</string>
+        <string>{python_script_path}</string>{args_xml}
     </array>
     <key>StartCalendarInterval</key>
     <dict>
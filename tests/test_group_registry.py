@@ -0,0 +1,39 @@
+from group_registry import GroupRegistry
+
+
+def raw(i, subject=None, owner="dono1", is_community=False, size=10):
+    return {"id": f"grupo{i}", "subject": subject or f"Grupo {i}", "owner": owner,
+            "isCommunity": is_community, "size": size}
+
+
+def nomes(registry, prefix):
+    return [group["subject"] for group in registry.search_name(prefix)]
+
+
+def test_update_reindexes_only_changed_groups():
+    registry = GroupRegistry()
+    assert registry.update([raw(1), raw(2), raw(3, subject="Avisos")]) == 3
+
+    # Mudança fora dos índices não reindexa, mas o dado novo passa a ser retornado
+    atualizado = [raw(1, size=99), raw(2, subject="Beta"), raw(4, owner="dono2", is_community=True)]
+    assert registry.update(atualizado) == 3
+
+    assert registry.get("grupo1")["size"] == 99
+    assert registry.get("grupo3") is None
+    assert nomes(registry, "") == ["Beta", "Grupo 1", "Grupo 4"]
+    assert nomes(registry, "grupo") == ["Grupo 1", "Grupo 4"]
+    assert nomes(registry, "avisos") == []
+    assert [group["id"] for group in registry.by_owner("dono2")] == ["grupo4"]
+    assert [group["id"] for group in registry.communities()] == ["grupo4"]
+
+
+def test_name_index_stays_sorted_across_incremental_updates():
+    registry = GroupRegistry()
+    grupos = [raw(i) for i in range(50)]
+    registry.update(grupos)
+    grupos = grupos[10:] + [raw(i, subject=f"Novo {i}") for i in range(5)]
+    registry.update(grupos)
+
+    esperado = sorted((group["subject"].casefold(), group["id"]) for group in grupos)
+    assert registry._names == esperado
+    assert len(registry) == len(grupos)
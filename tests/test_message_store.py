@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from message_sandeco import MessageSandeco
+from message_store import MessageStore, FORMATO_DATA
+
+AGORA = datetime(2026, 10, 18, 12, 0, 0)
+
+
+def record(i, timestamp):
+    return {"key": {"id": f"MSG{i}", "remoteJid": "120363000000000000@g.us", "fromMe": False},
+            "pushName": "Usuário", "messageType": "conversation", "messageTimestamp": timestamp,
+            "message": {"conversation": f"Mensagem {i}"}}
+
+
+class FakeApi:
+    """Simula GroupController.iter_messages sobre uma lista de mensagens, da mais recente para a mais antiga."""
+
+    def __init__(self, timestamps, fail_after=None):
+        self.msgs = [MessageSandeco(record(i, ts)) for i, ts in enumerate(sorted(timestamps, reverse=True))]
+        self.fail_after = fail_after
+        self.calls = []
+
+    def __call__(self, remote_jid, start_date, end_date):
+        inicio = int(datetime.strptime(start_date, FORMATO_DATA).timestamp())
+        fim = int(datetime.strptime(end_date, FORMATO_DATA).timestamp())
+        self.calls.append((inicio, fim))
+        for n, msg in enumerate(m for m in self.msgs if inicio <= m.message_timestamp <= fim):
+            if self.fail_after is not None and n == self.fail_after:
+                raise RuntimeError("rate-overlimit")
+            yield msg
+
+
+def window(days_ago):
+    fim = AGORA - timedelta(days=days_ago)
+    return (fim - timedelta(days=1)).strftime(FORMATO_DATA), fim.strftime(FORMATO_DATA)
+
+
+def timestamps_in(days_ago, total):
+    fim = int((AGORA - timedelta(days=days_ago)).timestamp())
+    return [fim - 60 * (i + 1) for i in range(total)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MessageStore(db_path=str(tmp_path / "archive.db"), overlap=600)
+
+
+def test_earlier_window_is_fetched_after_a_recent_sync(store):
+    api = FakeApi(timestamps_in(0, 100) + timestamps_in(2, 80))
+    jid = "120363000000000000@g.us"
+
+    store.sync(jid, api, *window(0))
+    assert len(store.get_messages(jid, *window(0))) == 100
+
+    store.sync(jid, api, *window(2))
+    assert len(store.get_messages(jid, *window(2))) == 80
+
+
+def test_interrupted_sync_is_completed_by_the_next_one(store):
+    api = FakeApi(timestamps_in(0, 1200))
+    jid = "120363000000000000@g.us"
+
+    api.fail_after = 600
+    with pytest.raises(RuntimeError):
+        store.sync(jid, api, *window(0), batch_size=500)
+    api.fail_after = None
+
+    store.sync(jid, api, *window(0))
+    assert len(store.get_messages(jid, *window(0))) == 1200
+
+
+def test_resync_only_fetches_the_overlap_and_picks_up_late_messages(store):
+    fim = int(datetime.strptime(window(0)[1], FORMATO_DATA).timestamp())
+    api = FakeApi(timestamps_in(0, 100))
+    jid = "120363000000000000@g.us"
+    store.sync(jid, api, *window(0))
+
+    # Mensagem entregue com atraso, com timestamp anterior ao fim do trecho já sincronizado
+    api.msgs.insert(0, MessageSandeco(record("atrasada", fim - 30)))
+    api.calls.clear()
+    store.sync(jid, api, *window(0))
+
+    assert api.calls == [(fim - 600, fim)]
+    assert len(store.get_messages(jid, *window(0))) == 101
@@ -0,0 +1,43 @@
+import threading
+
+from outbound_queue import OutboundQueue
+
+
+class FakeSender:
+    """Simula SendSandeco.textMessage, registrando as mensagens entregues."""
+
+    def __init__(self, falhas=()):
+        self.falhas = set(falhas)
+        self.entregues = []
+        self.lock = threading.Lock()
+
+    def textMessage(self, number, text):
+        if number in self.falhas:
+            return {"status": 500, "error": "Internal Server Error"}
+        with self.lock:
+            self.entregues.append((number, text))
+        return {"status": 201}
+
+
+def test_single_drain_with_workers_delivers_every_message_once(tmp_path):
+    queue = OutboundQueue(db_path=str(tmp_path / "outbox.db"))
+    sender = FakeSender()
+    keys = [queue.enqueue(f"grupo{i}", f"Resumo {i}", idempotency_key=f"grupo{i}:2026-10-18") for i in range(25)]
+
+    contagem = queue.drain(sender, batch_size=10, workers=4)
+
+    assert contagem[OutboundQueue.SENT] == 25
+    assert sorted(sender.entregues) == sorted((f"grupo{i}", f"Resumo {i}") for i in range(25))
+    assert {queue.get_status(key) for key in keys} == {OutboundQueue.SENT}
+    assert queue.pending_count() == 0
+
+
+def test_failed_delivery_goes_back_to_pending(tmp_path):
+    queue = OutboundQueue(db_path=str(tmp_path / "outbox.db"))
+    ok = queue.enqueue("grupo1", "Resumo 1")
+    falha = queue.enqueue("grupo2", "Resumo 2")
+
+    queue.drain(FakeSender(falhas={"grupo2"}), workers=2)
+
+    assert queue.get_status(ok) == OutboundQueue.SENT
+    assert queue.get_status(falha) == OutboundQueue.PENDING
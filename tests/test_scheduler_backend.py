@@ -0,0 +1,52 @@
+import threading
+from datetime import datetime
+
+from scheduler_backend import InProcessSchedulerBackend, make_job
+
+
+class FakeProcess:
+    def poll(self):
+        return 0
+
+
+def run_with_clock(backend, instantes):
+    """Executa run_forever com um relógio que percorre `instantes`; retorna as tarefas disparadas."""
+    stop_event = threading.Event()
+    relogio = iter(instantes)
+    disparadas = []
+
+    def clock():
+        try:
+            return next(relogio)
+        except StopIteration:
+            stop_event.set()
+            return instantes[-1]
+
+    def launch(job):
+        disparadas.append(job["task_name"])
+        return FakeProcess()
+
+    backend._launch = launch
+    backend.run_forever(stop_event, poll_interval=0, clock=clock)
+    return disparadas
+
+
+def test_backwards_clock_step_does_not_refire_jobs(tmp_path):
+    backend = InProcessSchedulerBackend(db_path=str(tmp_path / "jobs.db"))
+    backend.apply(upserts=[make_job("ResumoGrupo_1", __file__, "01:30")])
+
+    # Fim do horário de verão: o relógio passa de 01:59 de volta para 01:00 e atravessa 01:30 de novo
+    instantes = [datetime(2026, 2, 22, h, m) for h, m in
+                 [(1, 0), (1, 29), (1, 30), (1, 45), (1, 59), (1, 0), (1, 29), (1, 30), (1, 31), (2, 0)]]
+
+    assert run_with_clock(backend, instantes) == ["ResumoGrupo_1"]
+
+
+def test_job_fires_again_on_the_next_day(tmp_path):
+    backend = InProcessSchedulerBackend(db_path=str(tmp_path / "jobs.db"))
+    backend.apply(upserts=[make_job("ResumoGrupo_1", __file__, "01:30")])
+
+    instantes = [datetime(2026, 2, 22, 1, 0), datetime(2026, 2, 22, 1, 30),
+                 datetime(2026, 2, 23, 1, 0), datetime(2026, 2, 23, 1, 30)]
+
+    assert run_with_clock(backend, instantes) == ["ResumoGrupo_1", "ResumoGrupo_1"]
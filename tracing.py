@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import secrets
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Span ativo no contexto atual; define o pai dos spans abertos dentro dele
+_current = contextvars.ContextVar("current_span", default=None)
+_write_lock = threading.Lock()
+_local = threading.local()
+
+
+def _flag(name):
+    return os.getenv(name, "").lower() in ("1", "true", "sim", "yes")
+
+
+def enabled():
+    """Rastreamento ligado por TRACE_ENABLED=1."""
+    return _flag("TRACE_ENABLED")
+
+
+def trace_file():
+    """Arquivo JSON Lines que recebe os spans (TRACE_FILE, padrão traces.jsonl no diretório do projeto)."""
+    return os.getenv("TRACE_FILE") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces.jsonl")
+
+
+class Span:
+    """Trecho cronometrado da execução, gravado no formato de span do OpenTelemetry (campos principais)."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_span_id", "attributes", "start_ns", "_start", "status", "error")
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter_ns()
+        self.status = "OK"
+        self.error = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def to_record(self, duration_ns):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.start_ns + duration_ns,
+            "duration_ms": round(duration_ns / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.error} if self.error else {"code": self.status},
+            "resource": {"service.name": "whatsapp-summary", "process.pid": os.getpid()},
+            "thread": threading.current_thread().name,
+        }
+
+
+class _NoopSpan:
+    """Span usado quando o rastreamento está desligado."""
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def _write(record):
+    linha = json.dumps(record, ensure_ascii=False, default=str)
+    with _write_lock:
+        with open(trace_file(), "a", encoding="utf-8") as f:
+            f.write(linha + "\n")
+
+
+def _start_profile(span):
+    """Com TRACE_PROFILE=1, cada span raiz (sem pai) é medido também pelo cProfile e salvo em um arquivo .prof."""
+    if not _flag("TRACE_PROFILE") or span.parent_span_id is not None or getattr(_local, "profiler", None) is not None:
+        return None
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Outro profiler já está ativo neste interpretador
+        return None
+    _local.profiler = profiler
+    return profiler
+
+
+def _stop_profile(span, profiler):
+    profiler.disable()
+    _local.profiler = None
+    profile_dir = os.getenv("TRACE_PROFILE_DIR") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+    os.makedirs(profile_dir, exist_ok=True)
+    path = os.path.join(profile_dir, f"{span.name}-{span.trace_id[:8]}-{span.span_id}.prof")
+    profiler.dump_stats(path)
+    span.set_attribute("profile.path", path)
+
+
+@contextmanager
+def span(name, **attributes):
+    """Mede o bloco como um span; o span aberto no contexto atual vira o pai.
+
+    Uso:
+        with tracing.span("summary.fetch", group_id=group_id) as s:
+            ...
+            s.set_attribute("messages", len(msgs))
+    """
+    if not enabled():
+        yield _NOOP
+        return
+    atual = Span(name, _current.get(), attributes)
+    token = _current.set(atual)
+    profiler = _start_profile(atual)
+    try:
+        yield atual
+    except BaseException as e:
+        atual.status = "ERROR"
+        atual.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        duration = time.perf_counter_ns() - atual._start
+        _current.reset(token)
+        if profiler is not None:
+            _stop_profile(atual, profiler)
+        try:
+            _write(atual.to_record(duration))
+        except OSError as e:
+            print(f"Erro ao gravar o span {name}: {e}")
+
+
+def traced(name=None):
+    """Decorador que executa a função dentro de um span (por padrão, módulo.função)."""
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def set_attribute(key, value):
+    """Acrescenta um atributo ao span ativo, se houver."""
+    atual = _current.get()
+    if atual is not None:
+        atual.set_attribute(key, value)
+
+
+def propagate(func):
+    """Liga a função ao span atual para que, executada em outra thread (ThreadPoolExecutor), continue o mesmo trace."""
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper